@@ -1,11 +1,17 @@
+import os
 import tkinter as tk
+import queue
 from tkinter import filedialog, ttk, messagebox
 from base_page import BasePage
+from forecast_scheduler import ForecastScheduler
+from chart_layer import ChartLayer
+from downsample import visible, minmax
+from virtual_table import VirtualTable
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
 import numpy as np
+from ml import read_sales, read_tail, read_many, name_products
 
 DARK_BG      = "#111111"
 PANEL_BG     = "#181818"
@@ -18,67 +24,48 @@ FG_PRIMARY   = "#FFFFFF"
 FG_SECONDARY = "#AAAAAA"
 FG_MUTED     = "#555555"
 
+FIT_TIMEOUT     = 15   # seconds any single SARIMA fit may take
+REQUEST_TIMEOUT = 60   # seconds for a whole forecast run
+FORECAST_DAYS   = 28
+WINDOW_WEEKS    = range(4, 9)  # training windows offered by the spinner
+POLL_MS         = 50   # how often the Tk thread checks for worker results
+DEBOUNCE_MS     = 400  # wait for the spinner to settle before re-forecasting
+
 
 def _hover(btn, normal, hot):
     btn.bind("<Enter>", lambda e: btn.config(bg=hot))
     btn.bind("<Leave>", lambda e: btn.config(bg=normal))
 
 
-def _smart_forecast(ts_train, steps=28):
-    """
-    Tiered forecast:
-      - 42+ days  → SARIMA (with flat-line fallback detection)
-      - 14-41 days → Seasonal MA
-      - < 14 days  → flat mean
-    """
-    n    = len(ts_train)
-    vals = ts_train.values.astype(float)
-
-    def _seasonal_ma(series, steps):
-        week   = 7
-        last2  = series[-week * 2:] if len(series) >= week * 2 else series
-        w1     = last2[:week] if len(last2) >= week * 2 else last2
-        w2     = last2[week:] if len(last2) >= week * 2 else last2
-        pattern = 0.35 * w1 + 0.65 * w2
-        x      = np.arange(len(last2))
-        slope  = np.clip(np.polyfit(x, last2, 1)[0], -2.0, 2.0)
-        return np.array([max(0.0, float(pattern[i % week]) + slope * (i + 1))
-                         for i in range(steps)])
-
-    if n >= 42:
-        try:
-            from ml.forecasting import sarima_forecast
-            raw      = sarima_forecast(ts_train, steps=steps)
-            t_mean   = float(ts_train.mean())
-            t_std    = float(ts_train.std())
-            raw      = raw.clip(lower=max(0, t_mean - 3 * t_std),
-                                upper=t_mean + 3 * t_std)
-            raw_vals = raw.values.astype(float)
-            if raw_vals.std() < t_std * 0.20:
-                return _seasonal_ma(vals, steps), "Seasonal MA"
-            return raw_vals, "SARIMA"
-        except Exception as e:
-            print(f"[SARIMA failed] {e}")
-
-    if n >= 14:
-        return _seasonal_ma(vals, steps), "Seasonal MA"
-
-    return np.full(steps, float(ts_train.mean())), "Mean"
-
-
 class DashboardPage(BasePage):
     def __init__(self, parent, controller):
         super().__init__(parent, controller)
         self.config(bg=DARK_BG)
         self.content.config(bg=DARK_BG)
         self.data            = None
+        self.store           = None
+        # per product: history and forecast as datetime64 / float arrays
         self._plot_data      = {}
-        self._forecast_start = None
-        self._all_dates      = []
+        self._forecast_start = None   # np.datetime64
+        self._date_range     = None   # (first history date, last forecast date)
+        self._chart_title    = ""
+        self._train_weeks    = None   # window of the forecast on screen
+        self._debounce_id    = None
+        # Finished forecasts live in controller.forecasts under
+        # (shared_data.version, column) with variant ("smart", train weeks)
+        # All windows are forecast in the background after a load;
+        # _waiting_for is the (version, weeks) the chart still needs
+        self._scheduler      = ForecastScheduler(FORECAST_DAYS, FIT_TIMEOUT,
+                                                 REQUEST_TIMEOUT)
+        self._waiting_for    = None
+        # (path, bytes read) of the loaded file, so "Append rows" on the
+        # same, grown file only reads the new tail
+        self._source         = None
 
         self._build_header()
         self._build_controls()
         self._build_main_area()
+        self.after(POLL_MS, self._poll_scheduler)
 
     # Header
     def _build_header(self):
@@ -120,13 +107,24 @@ class DashboardPage(BasePage):
         up_btn.pack(side="left", padx=(14, 8))
         _hover(up_btn, ACCENT_PINK, "#D0005A")
 
+        # Append new days (a file of new rows, or the loaded file once it grew)
+        ap_btn = tk.Button(bar, text="Append rows",
+                           command=self.append_csv,
+                           font=("Helvetica", 9, "bold"),
+                           bg=CARD_BG, fg=ACCENT_PINK,
+                           activebackground=PANEL_BG,
+                           padx=14, pady=7, bd=0, relief="flat",
+                           cursor="hand2")
+        ap_btn.pack(side="left", padx=(0, 8))
+        _hover(ap_btn, CARD_BG, "#2A2A2A")
+
         # Training period spinner auto-runs forecast on change
         tk.Label(bar, text="Training period:",
                  font=("Helvetica", 9),
                  fg=FG_SECONDARY, bg=PANEL_BG).pack(side="left", padx=(14, 4))
 
         self.training_weeks = tk.Spinbox(
-            bar, from_=4, to=8, width=3,
+            bar, from_=WINDOW_WEEKS[0], to=WINDOW_WEEKS[-1], width=3,
             font=("Helvetica", 10, "bold"),
             bg=CARD_BG, fg=ACCENT_PINK,
             buttonbackground=CARD_BG, relief="flat", bd=0,
@@ -205,6 +203,18 @@ class DashboardPage(BasePage):
         self.canvas.get_tk_widget().pack(fill="both", expand=True,
                                          padx=6, pady=6)
 
+        # Static styling is done once; forecasts only update the artists
+        self.ax.set_xlabel("Date", color=FG_MUTED, fontsize=9)
+        self.ax.set_ylabel("Units Sold", color=FG_MUTED, fontsize=9)
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%d %b"))
+        self.ax.xaxis.set_major_locator(mdates.WeekdayLocator(interval=2))
+        self.figure.autofmt_xdate(rotation=25)
+        self.chart = ChartLayer(self.ax, self.canvas,
+                                legend=dict(loc="upper left", fontsize=8,
+                                            framealpha=0.2, facecolor=CARD_BG,
+                                            edgecolor="#333333",
+                                            labelcolor=FG_SECONDARY))
+
         # Tables
         tables_frame = tk.Frame(pane, bg=DARK_BG)
         pane.add(tables_frame, minsize=150)
@@ -214,29 +224,40 @@ class DashboardPage(BasePage):
                       highlightbackground="#2A2A2A", highlightthickness=1)
         lf.pack(side="left", fill="both", expand=True, padx=(0, 4), pady=2)
 
+        # Whole file, only the rows in view are materialised
+        self.table_actual = VirtualTable(lf, style="Pink.Treeview", height=4)
+
         lh = tk.Frame(lf, bg=PANEL_BG)
         lh.pack(fill="x")
         tk.Label(lh, text="Historical Sales Data",
                  font=("Helvetica", 9, "bold"),
                  fg=FG_PRIMARY, bg=PANEL_BG,
                  pady=7, padx=10).pack(side="left")
-        tk.Label(lh, text="(first 100 rows)",
+        tk.Label(lh, textvariable=self.table_actual.status,
                  font=("Helvetica", 8),
                  fg=FG_MUTED, bg=PANEL_BG).pack(side="left")
 
-        li = tk.Frame(lf, bg=CARD_BG)
-        li.pack(fill="both", expand=True)
-        lhs = tk.Scrollbar(li, orient=tk.HORIZONTAL)
-        lvs = tk.Scrollbar(li, orient=tk.VERTICAL)
-        self.tree_actual = ttk.Treeview(li, show="headings",
-                                         style="Pink.Treeview",
-                                         xscrollcommand=lhs.set,
-                                         yscrollcommand=lvs.set, height=4)
-        lhs.config(command=self.tree_actual.xview)
-        lvs.config(command=self.tree_actual.yview)
-        lhs.pack(side="bottom", fill="x")
-        lvs.pack(side="right",  fill="y")
-        self.tree_actual.pack(fill="both", expand=True)
+        for text, pages in (("\u203a", 1), ("\u2039", -1)):
+            btn = tk.Button(lh, text=text,
+                            command=lambda p=pages: self.table_actual.page(p),
+                            font=("Helvetica", 10, "bold"),
+                            bg=PANEL_BG, fg=FG_SECONDARY,
+                            activebackground=CARD_BG, padx=6, bd=0,
+                            relief="flat", cursor="hand2")
+            btn.pack(side="right", padx=(0, 4))
+            _hover(btn, PANEL_BG, CARD_BG)
+
+        self.jump_var = tk.StringVar()
+        jump = tk.Entry(lh, textvariable=self.jump_var, width=11,
+                        font=("Helvetica", 8), bg=CARD_BG, fg=FG_SECONDARY,
+                        insertbackground=FG_SECONDARY, relief="flat")
+        jump.pack(side="right", padx=(0, 10))
+        jump.bind("<Return>", lambda e: self._jump_to_date())
+        tk.Label(lh, text="Go to date:",
+                 font=("Helvetica", 8),
+                 fg=FG_MUTED, bg=PANEL_BG).pack(side="right", padx=(0, 4))
+
+        self.table_actual.pack(fill="both", expand=True)
 
         # Forecast table (right)
         rf = tk.Frame(tables_frame, bg=CARD_BG,
@@ -282,129 +303,234 @@ class DashboardPage(BasePage):
         ax.grid(True, alpha=0.15, color="#FFFFFF", linestyle="--")
 
     def _on_training_change(self):
-        """Called whenever the spinner value changes."""
+        """Called whenever the spinner value changes; debounced so a burst
+        of clicks only forecasts the value the user stops on."""
+        self._waiting_for = None
+        if self._debounce_id is not None:
+            self.after_cancel(self._debounce_id)
+        self._debounce_id = self.after(DEBOUNCE_MS, self._on_training_settled)
+
+    def _on_training_settled(self):
+        self._debounce_id = None
         if self.data is not None:
             self.run_forecast()
 
     # CSV loading
     def load_csv(self):
-        path = filedialog.askopenfilename(
+        """Load one sales file, or several (e.g. Coffee + Croissant) merged
+        into one table on their dates"""
+        paths = filedialog.askopenfilenames(
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-            title="Select Sales Data CSV")
-        if not path:
+            title="Select Sales Data CSV (one or more)")
+        if not paths:
             return
 
+        self._waiting_for = None
         self._set_status("Loading...", ACCENT_AMB)
         self.content.update()
         try:
-            peek = pd.read_csv(path, nrows=1)
-            if any("Unnamed" in str(c) for c in peek.columns):
-                data = pd.read_csv(path, header=[0, 1])
-                data.columns = [c[1] if "Unnamed" not in c[1] else c[0]
-                                 for c in data.columns]
+            def progress(rows):
+                self._set_status(f"Loading... {rows:,} rows", ACCENT_AMB)
+                self.content.update_idletasks()
+
+            # One streaming pass per file; every page reads the typed columns
+            if len(paths) == 1:
+                store, report = read_sales(paths[0], progress=progress)
+                self._source = (os.path.abspath(paths[0]), report["bytes"])
+                store = name_products(store)
+                loaded = f"Loaded {report['rows']:,} rows"
             else:
-                data = pd.read_csv(path, header=0)
+                store, report = read_many(list(paths), rename=name_products)
+                self._source = None  # appending reads a file of new rows
+                loaded = (f"Loaded {len(paths)} files, {len(store.products)} "
+                          f"products over {len(store):,} days")
+            self._set_status(f"{loaded} ({report['rows_per_sec']:,.0f} rows/s)",
+                             ACCENT_GREEN)
+            self._use_store(store)
 
-            data.columns = data.columns.str.strip()
-            product_cols = [c for c in data.columns if c != "Date"]
-            if len(product_cols) == 1 and product_cols[0] == "Number Sold":
-                data.rename(columns={"Number Sold": "Croissant"}, inplace=True)
-
-            for col in [c for c in data.columns if c != "Date"]:
-                data[col] = pd.to_numeric(data[col], errors="coerce")
+        except Exception as exc:
+            self._set_status("Load failed", "#E74C3C")
+            messagebox.showerror("Load Error", f"Failed to read CSV:\n{exc}")
 
-            data["Date"] = pd.to_datetime(data["Date"], dayfirst=True)
-            self.data = data
-            self.controller.shared_data = self.data
+    def append_csv(self):
+        """Add new days to the loaded data. Picking the loaded file again
+        reads only what was written to it since; any other file is read as
+        rows to add. Only products with new sales are re-forecast."""
+        if self.store is None:
+            self.load_csv()
+            return
+        path = filedialog.askopenfilename(
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            title="Select New Sales Rows (or the updated file)")
+        if not path:
+            return
 
-            self._populate_actual_table(self.data)
-            self.run_forecast()
-            self._set_status(f"Loaded {len(data)} rows", ACCENT_GREEN)
+        self._set_status("Appending...", ACCENT_AMB)
+        self.content.update()
+        try:
+            same_file = (self._source is not None
+                         and os.path.abspath(path) == self._source[0])
+            if same_file:
+                tail, report = read_tail(path, self._source[1])
+            else:
+                tail, report = read_sales(path, cache=False)
+            tail = name_products(tail)
+            store = self.store.append(tail)  # checks the dates follow on
+            if same_file:
+                self._source = (self._source[0], report["bytes"])
+
+            if store is self.store:
+                self._set_status("No new rows", FG_SECONDARY)
+                return
+            changed = [p for p in tail.products if tail.stats(p)["count"]]
+            self._set_status(f"Appended {report['rows']:,} rows; "
+                             f"re-forecasting {len(changed)} products",
+                             ACCENT_GREEN)
+            self._use_store(store, changed=changed)
+            self.table_actual.scroll_to(len(store))
 
         except Exception as exc:
-            self._set_status("Load failed", "#E74C3C")
-            messagebox.showerror("Load Error", f"Failed to read CSV:\n{exc}")
+            self._set_status("Append failed", "#E74C3C")
+            messagebox.showerror("Append Error", f"Failed to append rows:\n{exc}")
+
+    def _use_store(self, store, changed=None):
+        """Publish a new store to every page and forecast it. With `changed`
+        (products that got new rows) the other products keep the forecasts
+        they have, per window, since their data is the same; every window
+        then forecasts whatever it lacks."""
+        old_version = self.controller.shared_data.version
+        self.store = store
+        self.data  = self.store.frame()
+        version    = self.controller.shared_data.set(self.store)
+        if changed is not None and self.controller.forecasts.version == old_version:
+            self.controller.forecasts.carry(
+                version, [p for p in store.products if p not in changed])
+        self.chart.forget_frames()
+        self.table_actual.set_store(self.store)
+        self._waiting_for = None
+        self._precompute_windows(extends=changed is not None)
+        self.run_forecast()
 
     # Forecast
+    def _precompute_windows(self, extends=False):
+        """Queue every training window for the new dataset: the selected
+        one first, then the others nearest-first, so switching later is
+        just a redraw. Each window only forecasts the products it has no
+        registry entry for; `extends` says rows were only appended (see
+        ForecastScheduler)."""
+        selected = int(self.training_weeks.get())
+        self._scheduler.reset(self.controller.shared_data.version, self.data,
+                              extends)
+        for weeks in sorted(WINDOW_WEEKS, key=lambda w: abs(w - selected)):
+            self._scheduler.submit(weeks, abs(weeks - selected),
+                                   self._missing(weeks))
+
+    def _missing(self, train_weeks):
+        """Products with no forecast (or failure) registered for a window"""
+        version  = self.controller.shared_data.version
+        registry = self.controller.forecasts
+        return [c for c in self.store.products
+                if registry.get(version, c, ("smart", train_weeks)) is None]
+
     def run_forecast(self):
+        """Draw the selected window from the registry, or move it to the front
+        of the background queue; _poll_scheduler draws it when done."""
         if self.data is None:
             return
 
-        self.ax.clear()
-        self._style_ax(self.ax)
+        train_weeks = int(self.training_weeks.get())
+        version     = self.controller.shared_data.version
+        columns     = self.store.products
+        registry    = self.controller.forecasts
+
+        cached = {c: registry.get(version, c, ("smart", train_weeks))
+                  for c in columns}
+        missing = [c for c, res in cached.items() if res is None]
+        if not missing:
+            self._waiting_for = None
+            self._draw_forecast(cached, columns, train_weeks)
+            return
 
-        train_weeks   = int(self.training_weeks.get())
-        FORECAST_DAYS = 28
+        self._waiting_for = (version, train_weeks)
+        self._scheduler.submit(train_weeks, 0, missing)
+        self._set_status(f"Forecasting 0/{len(missing)} products...", ACCENT_AMB)
 
+    def _poll_scheduler(self):
+        """Runs on the Tk thread: register finished windows, show progress
+        for the one on screen and draw it once it is in."""
+        try:
+            while True:
+                msg = self._scheduler.results.get_nowait()
+                kind, version, weeks = msg[:3]
+                if version != self.controller.shared_data.version:
+                    continue  # from a file that has since been replaced
+                waiting = self._waiting_for == (version, weeks)
+
+                if kind == "progress":
+                    if waiting:
+                        _, _, _, col, done, total = msg
+                        self._set_status(f"Forecasting {done}/{total} products "
+                                         f"({col} done)...", ACCENT_AMB)
+                elif kind == "done":
+                    results = msg[3]
+                    # failed products too, so run_forecast finds the window
+                    # complete instead of waiting for it again
+                    for col, res in results.items():
+                        self.controller.forecasts.put(
+                            version, ("smart", weeks), res)
+                    if waiting:
+                        # draws from the registry, or asks again for
+                        # products this run did not cover
+                        self.run_forecast()
+                else:
+                    print(f"[Forecast] {weeks}wk window: {msg[3]}")
+                    if waiting:
+                        self._waiting_for = None
+                        self._set_status("Forecast failed", "#E74C3C")
+        except queue.Empty:
+            pass
+
+        self.after(POLL_MS, self._poll_scheduler)
+
+    def _draw_forecast(self, results, columns, train_weeks):
         COLORS = [ACCENT_PINK, ACCENT_BLUE, "#A855F7", ACCENT_AMB, "#34D399"]
         forecast_table   = {}
         self._plot_data  = {}
         self._forecast_start = None
-        self._all_dates  = []
+        self._date_range = None
         methods_used     = set()
 
-        for ci, col in enumerate([c for c in self.data.columns
-                                   if c != "Date"]):
+        for ci, col in enumerate(columns):
+            res = results[col]
+            if not res.ok:
+                if res.error:
+                    print(f"[Forecast] {col}: {res.error}")
+                continue
             try:
-                full_ts = (
-                    self.data[["Date", col]].dropna(subset=[col])
-                    .assign(**{col: lambda df, c=col:
-                                pd.to_numeric(df[c], errors="coerce")})
-                    .dropna(subset=[col])
-                    .set_index("Date")[col]
-                )
-                if full_ts.empty or len(full_ts) < 14:
-                    continue
-
-                train_days = train_weeks * 7
-                ts_train   = (full_ts.tail(train_days)
-                              if len(full_ts) > train_days else full_ts)
-
-                smooth_vals, method = _smart_forecast(ts_train,
-                                                       steps=FORECAST_DAYS)
-                methods_used.add(method)
-
-                # Hard-cap to exactly FORECAST_DAYS values so weekly
-                # slicing always produces exactly 4 non-overlapping buckets
-                smooth_vals = np.asarray(smooth_vals).flatten()[:FORECAST_DAYS]
-                if len(smooth_vals) < FORECAST_DAYS:
-                    smooth_vals = np.pad(smooth_vals,
-                                         (0, FORECAST_DAYS - len(smooth_vals)),
-                                         constant_values=smooth_vals[-1])
-
-                t_std = float(ts_train.std())
-
-                future_dates = pd.date_range(
-                    start=full_ts.index[-1] + pd.Timedelta(days=1),
-                    periods=FORECAST_DAYS)
+                full_ts      = self.store.series(col)
+                smooth_vals  = res.values
+                future_dates = np.asarray(res.dates, dtype="datetime64[ns]")
+                history      = full_ts.index.to_numpy(dtype="datetime64[ns]")
+                methods_used.add(res.method)
 
                 if self._forecast_start is None:
                     self._forecast_start = future_dates[0]
 
-                color = COLORS[ci % len(COLORS)]
-
-                self.ax.plot(full_ts.index, full_ts,
-                             color=color, linewidth=1.8,
-                             label=f"{col} - actual", zorder=3)
-                self.ax.plot(future_dates, smooth_vals,
-                             color=color, linewidth=2.2, linestyle="--",
-                             alpha=0.9,
-                             label=f"{col} - forecast", zorder=3)
-                self.ax.fill_between(
-                    future_dates,
-                    np.maximum(0, smooth_vals - t_std * 0.6),
-                    smooth_vals + t_std * 0.6,
-                    color=color, alpha=0.10, zorder=2)
-
                 self._plot_data[col] = {
-                    "ts":           full_ts,
+                    "x":            history,
+                    "y":            full_ts.to_numpy(dtype=float),
                     "smooth":       smooth_vals,
                     "future_dates": future_dates,
-                    "color":        color}
+                    "t_std":        res.metrics["Train_Std"],
+                    "color":        COLORS[ci % len(COLORS)]}
 
-                # Collect all dates for zoom
-                self._all_dates.extend(full_ts.index.tolist())
-                self._all_dates.extend(future_dates.tolist())
+                # Date range for zoom
+                lo = history[0] if len(history) else future_dates[0]
+                hi = future_dates[-1]
+                if self._date_range is not None:
+                    lo = min(lo, self._date_range[0])
+                    hi = max(hi, self._date_range[1])
+                self._date_range = (lo, hi)
 
                 # FIX: 4 distinct weekly buckets (days 0-6, 7-13, 14-20, 21-27)
                 for w in range(4):
@@ -418,87 +544,114 @@ class DashboardPage(BasePage):
         if forecast_table:
             self._populate_forecast_table(forecast_table)
 
-        if self._forecast_start:
-            self.ax.axvline(self._forecast_start, color="#555555",
-                            linewidth=1.2, linestyle=":",
-                            label="Forecast start", zorder=1)
-
         method_str = " + ".join(sorted(methods_used)) if methods_used else ""
         self.method_var.set(f"Method: {method_str}" if method_str else "")
 
-        self.ax.set_title(
-            f"4-Week Sales Forecast  (trained on last {train_weeks} weeks)",
-            color=FG_SECONDARY, fontsize=10, pad=10, loc="left")
-        self.ax.set_xlabel("Date", color=FG_MUTED, fontsize=9)
-        self.ax.set_ylabel("Units Sold", color=FG_MUTED, fontsize=9)
-        self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%d %b"))
-        self.ax.xaxis.set_major_locator(mdates.WeekdayLocator(interval=2))
-
-        if self.ax.lines:
-            leg = self.ax.legend(loc="upper left", fontsize=8,
-                                  framealpha=0.2, facecolor=CARD_BG,
-                                  edgecolor="#333333")
-            for t in leg.get_texts():
-                t.set_color(FG_SECONDARY)
-
-        self.figure.autofmt_xdate(rotation=25)
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self._train_weeks = train_weeks
+        self._chart_title = (f"4-Week Sales Forecast  "
+                             f"(trained on last {train_weeks} weeks)")
+        self._render_chart()
         self._set_status(
             f"Forecast updated  ({train_weeks}wk training · {method_str})",
             ACCENT_GREEN)
 
+    def _history(self, col, limits):
+        """The product's history inside `limits`, decimated to about one
+        min/max pair per pixel column of the axes"""
+        p = self._plot_data[col]
+        x, y = p["x"], p["y"]
+        if limits is not None:
+            keep = visible(x, *limits)
+            x, y = x[keep], y[keep]
+        width = int(self.ax.get_window_extent().width)
+        return minmax(x, y, width)
+
+    def _render_chart(self):
+        """One chart pass over _plot_data for the current zoom"""
+        limits = self._zoom_limits()
+        self.chart.begin()
+
+        for col, p in self._plot_data.items():
+            color = p["color"]
+            smooth_vals, future_dates = p["smooth"], p["future_dates"]
+
+            hx, hy = self._history(col, limits)
+            actual = self.chart.line((col, "actual"), hx, hy,
+                                     color=color, linewidth=1.8, zorder=3)
+            actual.set_label(f"{col} - actual")
+            actual.set_color(color)
+            # forecasts change with the training window, history does not:
+            # only the dynamic artists are redrawn (blitted) on a spinner change
+            fc = self.chart.line((col, "forecast"), future_dates, smooth_vals,
+                                 dynamic=True,
+                                 color=color, linewidth=2.2, linestyle="--",
+                                 alpha=0.9, zorder=3)
+            fc.set_label(f"{col} - forecast")
+            fc.set_color(color)
+            band = self.chart.band(
+                (col, "band"), future_dates,
+                np.maximum(0, smooth_vals - p["t_std"] * 0.6),
+                smooth_vals + p["t_std"] * 0.6,
+                dynamic=True, color=color, alpha=0.10, zorder=2)
+            band.set_color(color)
+
+        if self._forecast_start is not None:
+            self.chart.vline("forecast_start", self._forecast_start,
+                             color="#555555", linewidth=1.2, linestyle=":",
+                             label="Forecast start", zorder=1)
+
+        self.chart.title(self._chart_title,
+                         color=FG_SECONDARY, fontsize=10, pad=10, loc="left")
+        # the static part of the chart only depends on these, so flipping
+        # between zoom presets is a blit of a cached frame
+        self.chart.finish(xlim=limits,
+                          frame=(self.controller.shared_data.version,
+                                 self._train_weeks, self.zoom_var.get()))
+
     # Zoom FIX: each option now sets a genuinely different x range
-    def apply_zoom(self):
-        if not self._plot_data or not self._all_dates:
-            return
+    def _zoom_limits(self):
+        """x range (np.datetime64) for the selected zoom preset, None
+        before any forecast"""
+        if not self._plot_data or self._date_range is None:
+            return None
 
-        zoom    = self.zoom_var.get()
-        all_d   = self._all_dates
-        max_d   = max(all_d)       # last forecast date
-        min_d   = min(all_d)       # first historical date
+        zoom         = self.zoom_var.get()
+        min_d, max_d = self._date_range   # first historical / last forecast date
+        day          = np.timedelta64(1, "D")
 
         if zoom == "Last 7 days":
             # 7 historical days up to the start of the forecast
-            anchor = self._forecast_start or max_d
-            self.ax.set_xlim(anchor - pd.Timedelta(days=7), anchor)
+            anchor = self._forecast_start if self._forecast_start is not None else max_d
+            return anchor - 7 * day, anchor
 
         elif zoom == "Last 14 days":
-            anchor = self._forecast_start or max_d
-            self.ax.set_xlim(anchor - pd.Timedelta(days=14), anchor)
+            anchor = self._forecast_start if self._forecast_start is not None else max_d
+            return anchor - 14 * day, anchor
 
         elif zoom == "Last 30 days":
-            anchor = self._forecast_start or max_d
-            self.ax.set_xlim(anchor - pd.Timedelta(days=30), anchor)
+            anchor = self._forecast_start if self._forecast_start is not None else max_d
+            return anchor - 30 * day, anchor
 
         elif zoom == "Forecast only":
             # Show only the 28-day forecast window
-            if self._forecast_start:
-                self.ax.set_xlim(
-                    self._forecast_start - pd.Timedelta(days=2),
-                    self._forecast_start + pd.Timedelta(days=28))
-            else:
-                self.ax.set_xlim(min_d, max_d)
+            if self._forecast_start is not None:
+                return (self._forecast_start - 2 * day,
+                        self._forecast_start + 28 * day)
+            return min_d, max_d
 
-        else:  # "All"
-            self.ax.set_xlim(min_d, max_d)
+        return min_d, max_d  # "All"
 
-        self.canvas.draw()
+    def apply_zoom(self):
+        # the history is re-sliced and re-decimated for the new range
+        if self._plot_data:
+            self._render_chart()
 
     # Table population
-    def _populate_actual_table(self, df):
-        self.tree_actual.delete(*self.tree_actual.get_children())
-        display = df.head(100)
-        self.tree_actual["columns"] = list(display.columns)
-        for col in display.columns:
-            self.tree_actual.heading(col, text=col)
-            self.tree_actual.column(col, width=110, anchor="center")
-        for _, row in display.iterrows():
-            vals = list(row)
-            if display.columns[0] == "Date" and isinstance(vals[0],
-                                                             pd.Timestamp):
-                vals[0] = vals[0].strftime("%d %b %Y")
-            self.tree_actual.insert("", "end", values=vals)
+    def _jump_to_date(self):
+        try:
+            self.table_actual.jump_to_date(self.jump_var.get().strip())
+        except (ValueError, OverflowError):
+            self._set_status("Enter a date like 14/02/2024", ACCENT_AMB)
 
     def _populate_forecast_table(self, forecast_dict):
         """Display forecast as Week rows × Product columns."""
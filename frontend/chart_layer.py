@@ -0,0 +1,280 @@
+import numpy as np
+import matplotlib.dates as mdates
+
+FRAME_CACHE = 12   # rendered backgrounds kept per layer (~1.5 MB each)
+
+
+def _num(x):
+    """x values as plain floats (dates become matplotlib date numbers)"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64) or x.dtype == object:
+        return mdates.date2num(x)
+    return x.astype(float)
+
+
+def _band_verts(x, lo, hi):
+    """Outline of the area between lo and hi, as fill_between builds it"""
+    x = _num(x)
+    return [np.column_stack([np.concatenate([x, x[::-1]]),
+                             np.concatenate([np.asarray(lo, dtype=float),
+                                             np.asarray(hi, dtype=float)[::-1]])])]
+
+
+def _same(a, b):
+    try:
+        return np.array_equal(np.asarray(a), np.asarray(b))
+    except Exception:
+        return False
+
+
+class ChartLayer:
+    """
+    Keeps the artists of one axes alive between redraws.
+
+    Every artist has a key. Inside a begin() ... finish() pass, line(),
+    band(), vline(), bars() and text() create the artist the first time a
+    key is seen and afterwards only update its data (set_data / set_verts /
+    set_height). Keys not touched in a pass are hidden. The legend and
+    tight_layout are only redone when the set of artists changes.
+
+    Artists created with dynamic=True (and the title) are animated: after
+    every full draw the rest of the figure is kept as a background bitmap,
+    so a pass that only changed dynamic artists, with the same axis
+    limits, is a restore + draw of those artists + blit. Anything else
+    is a full draw_idle.
+
+    finish(frame=key) also files the background of that pass under `key`
+    (plus the canvas size). Coming back to the same key later restores the
+    cached bitmap instead of re-rasterising; the key must capture
+    everything the static artists depend on. Resizing drops the cache.
+    """
+
+    def __init__(self, ax, canvas, legend=None, layout=True):
+        self.ax       = ax
+        self.canvas   = canvas
+        self.legend   = legend     # kwargs for ax.legend, None for no legend
+        self.layout   = layout
+        self._artists = {}         # key -> artist (or list of bar patches)
+        self._kinds   = {}
+        self._dynamic = set()
+        self._used    = set()
+        self._changed = True       # needs a new legend / layout
+        self._dirty   = True       # the background changed
+        self._legend_labels = None
+        self._xticklabels   = None
+        self._background    = None
+        self._frames        = {}    # (key, canvas size) -> background
+        self._frame         = None  # key of what is on screen
+        canvas.mpl_connect("resize_event", self._on_resize)
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_resize(self, event):
+        self.forget_frames()
+        if self.layout:
+            self.ax.figure.tight_layout()
+
+    def _on_draw(self, event):
+        # the dynamic artists are left out of a full draw; keep what was
+        # drawn as the background and paint them on top
+        self._background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+        if self._frame is not None:
+            self._frames.pop(self._frame, None)
+            while len(self._frames) >= FRAME_CACHE:
+                del self._frames[next(iter(self._frames))]  # oldest first
+            self._frames[self._frame] = self._background
+        self._draw_dynamic()
+
+    def forget_frames(self):
+        """Drop the cached frames (new data, resize)"""
+        self._frames.clear()
+
+    def _draw_dynamic(self):
+        for key in self._dynamic:
+            artist = self._artists.get(key)
+            if artist is not None and artist.get_visible():
+                self.ax.draw_artist(artist)
+        if self.ax.title.get_animated():
+            self.ax.draw_artist(self.ax.title)
+
+    @property
+    def empty(self):
+        """True before the first pass and after clear()"""
+        return not self._artists
+
+    def begin(self):
+        self._used = set()
+
+    def _get(self, key, kind, create, dynamic=False):
+        artist = self._artists.get(key)
+        if artist is None or self._kinds[key] != kind:
+            if artist is not None:
+                self._remove(key)
+            artist = self._artists[key] = create()
+            self._kinds[key] = kind
+            if dynamic:
+                self._dynamic.add(key)
+                artist.set_animated(True)
+            self._changed = True
+            self._dirty = True
+        self._used.add(key)
+        return artist
+
+    def _update(self, key, unchanged):
+        """Static artists only dirty the background when their data changes"""
+        if key not in self._dynamic and not unchanged:
+            self._dirty = True
+
+    def _remove(self, key):
+        artist = self._artists.pop(key)
+        for a in artist if isinstance(artist, list) else [artist]:
+            a.remove()
+        del self._kinds[key]
+        self._dynamic.discard(key)
+
+    def _show(self, key, artist):
+        for a in artist if isinstance(artist, list) else [artist]:
+            if not a.get_visible():
+                a.set_visible(True)
+                self._update(key, False)
+
+    def line(self, key, x, y, dynamic=False, **style):
+        line = self._get(key, "line", lambda: self.ax.plot(x, y, **style)[0], dynamic)
+        self._update(key, _same(line.get_xdata(orig=True), x)
+                     and _same(line.get_ydata(orig=True), y))
+        line.set_data(x, y)
+        self._show(key, line)
+        return line
+
+    def band(self, key, x, lo, hi, dynamic=False, **style):
+        band = self._get(key, "band",
+                         lambda: self.ax.fill_between(x, lo, hi, **style), dynamic)
+        verts = _band_verts(x, lo, hi)
+        paths = band.get_paths()
+        self._update(key, len(paths) == 1 and _same(paths[0].vertices, verts[0]))
+        band.set_verts(verts)
+        self._show(key, band)
+        return band
+
+    def vline(self, key, x, dynamic=False, **style):
+        vline = self._get(key, "vline", lambda: self.ax.axvline(x, **style), dynamic)
+        self._update(key, _same(vline.get_xdata(orig=True), [x, x]))
+        vline.set_xdata([x, x])
+        self._show(key, vline)
+        return vline
+
+    def bars(self, key, heights, colors, **style):
+        """One bar per height at x = 0..n-1; rebuilt only when n changes"""
+        n = len(heights)
+        patches = self._get(key, ("bars", n),
+                            lambda: list(self.ax.bar(range(n), heights,
+                                                     color=colors, **style)))
+        self._update(key, _same([p.get_height() for p in patches], heights))
+        for i, (patch, h) in enumerate(zip(patches, heights)):
+            patch.set_height(h)
+            patch.set_facecolor(colors[i % len(colors)])
+        self._show(key, patches)
+        return patches
+
+    def xticklabels(self, labels, **style):
+        """Category labels at x = 0..n-1, only reset when they change"""
+        labels = list(labels)
+        if labels != self._xticklabels:
+            self.ax.set_xticks(range(len(labels)))
+            self.ax.set_xticklabels(labels, **style)
+            self._xticklabels = labels
+            self._changed = True
+            self._dirty = True
+
+    def text(self, key, x, y, s, **style):
+        text = self._get(key, "text", lambda: self.ax.text(x, y, s, **style))
+        self._update(key, text.get_position() == (x, y) and text.get_text() == s)
+        text.set_position((x, y))
+        text.set_text(s)
+        self._show(key, text)
+        return text
+
+    def title(self, s, **style):
+        """Axes title, drawn with the dynamic artists"""
+        self.ax.set_title(s, **style)
+        self.ax.title.set_animated(True)
+
+    def _rescale(self):
+        ax = self.ax
+        ax.relim(visible_only=True)
+        # relim skips collections, so add the visible bands by hand
+        for key, kind in self._kinds.items():
+            artist = self._artists[key]
+            if kind == "band" and artist.get_visible():
+                for path in artist.get_paths():
+                    if len(path.vertices):
+                        ax.update_datalim(path.vertices)
+        ax.autoscale_view()
+
+    def finish(self, autoscale=True, xlim=None, frame=None):
+        """Hide unused artists, fix the limits and redraw (blit if possible).
+        `xlim` overrides the autoscaled x range; `frame` is the cache key
+        of this pass (see the class docstring)."""
+        for key, artist in self._artists.items():
+            if key not in self._used:
+                for a in artist if isinstance(artist, list) else [artist]:
+                    if a.get_visible():
+                        a.set_visible(False)
+                        self._update(key, False)
+
+        if self.legend is not None:
+            handles = [a for key, a in self._artists.items()
+                       if key in self._used
+                       and self._kinds[key] in ("line", "band", "vline")
+                       and a.get_label() and not a.get_label().startswith("_")]
+            labels = [h.get_label() for h in handles]
+            if labels != self._legend_labels:
+                old = self.ax.get_legend()
+                if old is not None:
+                    old.remove()
+                if handles:
+                    self.ax.legend(handles=handles, labels=labels, **self.legend)
+                self._legend_labels = labels
+                self._changed = True
+                self._dirty = True
+
+        limits = (self.ax.get_xlim(), self.ax.get_ylim())
+        if autoscale:
+            self._rescale()
+        if xlim is not None:
+            self.ax.set_xlim(*xlim)
+        if (self.ax.get_xlim(), self.ax.get_ylim()) != limits:
+            self._dirty = True
+
+        if self._changed and self.layout:
+            self.ax.figure.tight_layout()
+        self._changed = False
+
+        self._frame = None
+        if frame is not None:
+            self._frame = (frame, self.canvas.get_width_height())
+            cached = self._frames.get(self._frame)
+            if cached is not None:
+                self._background = cached
+                self._dirty = False
+
+        if self._dirty or self._background is None:
+            self._dirty = False
+            self.canvas.draw_idle()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_dynamic()
+            self.canvas.blit(self.ax.figure.bbox)
+
+    def clear(self):
+        """Drop every artist (e.g. for an empty-state message)"""
+        for key in list(self._artists):
+            self._remove(key)
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        self.ax.title.set_animated(False)
+        self._frame         = None
+        self._legend_labels = None
+        self._xticklabels   = None
+        self._changed = True
+        self._dirty   = True
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+def visible(x, lo, hi):
+    """slice of the sorted array x inside [lo, hi], plus one point either
+    side so lines still run to the edges of the axes"""
+    start = max(0, int(np.searchsorted(x, lo, side="left")) - 1)
+    stop  = min(len(x), int(np.searchsorted(x, hi, side="right")) + 1)
+    return slice(start, stop)
+
+
+def minmax(x, y, buckets):
+    """
+    Min/max decimation: split the points into `buckets` runs and keep the
+    lowest and highest point of each (plus the first and last point), in
+    their original order. Peaks survive exactly, so the line looks the same
+    at one bucket per pixel column. Returns x, y unchanged when there are
+    already fewer than 2 * buckets points.
+    """
+    n = len(y)
+    if buckets < 1 or n <= 2 * buckets:
+        return x, y
+
+    size = -(-n // buckets)          # points per bucket, rounded up
+    rows = -(-n // size)
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(rows, size)
+
+    base = np.arange(rows) * size
+    keep = np.concatenate([[0, n - 1],
+                           base + np.nanargmin(padded, axis=1),
+                           base + np.nanargmax(padded, axis=1)])
+    keep = np.unique(keep)
+    return x[keep], y[keep]
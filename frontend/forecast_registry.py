@@ -0,0 +1,45 @@
+class ForecastRegistry:
+    """
+    Forecast results shared by all pages, keyed by (dataset version, product).
+
+    Each product keeps one ProductForecast per variant, e.g. ("smart", 6)
+    for a Dashboard forecast trained on 6 weeks, ("advanced", 7) for the
+    Analytics page metrics or ("holdout",) for a Dashboard forecast the
+    Analytics page added its metrics to. Failed results are stored as
+    well (res.ok is False), so a finished window is complete. Storing a
+    result for a newer dataset version drops everything from the older one.
+    """
+
+    def __init__(self):
+        self.version  = None
+        self._entries = {}   # product -> {variant: ProductForecast}
+
+    def put(self, version, variant, result):
+        if self.version is not None and version < self.version:
+            return  # late result for a replaced dataset
+        if version != self.version:
+            self.version  = version
+            self._entries = {}
+        self._entries.setdefault(result.product, {})[variant] = result
+
+    def carry(self, version, products):
+        """Move to a new dataset version keeping only `products`, for rows
+        appended that left those products' data unchanged"""
+        if self.version is not None and version < self.version:
+            return
+        self.version  = version
+        self._entries = {p: e for p, e in self._entries.items() if p in products}
+
+    def get(self, version, product, variant):
+        if version != self.version:
+            return None
+        return self._entries.get(product, {}).get(variant)
+
+    def with_metrics(self, version, product, *keys):
+        """Any stored result for the product whose metrics has all `keys`"""
+        if version != self.version:
+            return None
+        for result in self._entries.get(product, {}).values():
+            if result.ok and all(k in result.metrics for k in keys):
+                return result
+        return None
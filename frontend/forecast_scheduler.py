@@ -0,0 +1,153 @@
+import threading
+import queue
+import itertools
+
+from ml import forecast_many
+from ml.batch_forecast import smart_models
+from ml.parallel import CancelToken, Cancelled
+
+
+class ForecastScheduler:
+    """
+    Background worker that forecasts whole training windows in priority
+    order (lower number first) for the current dataset.
+
+    The window the user is looking at is submitted with priority 0 and
+    pre-empts whatever other window is running; the pre-empted window
+    goes back on the queue as speculative work. Each submit names the
+    products the window still lacks (e.g. those with no registry entry
+    after an append); a window runs until all of them are forecast.
+    Messages for the Tk thread are put on `results`:
+        ("progress", version, weeks, column, done, total)
+        ("done",     version, weeks, {column: ProductForecast})
+        ("error",    version, weeks, exception)
+
+    Each window keeps its SARIMA models (ml.incremental) across resets
+    that only add rows, so appended days extend the existing fits.
+    """
+
+    def __init__(self, steps, fit_timeout=None, request_timeout=None):
+        self.steps           = steps
+        self.fit_timeout     = fit_timeout
+        self.request_timeout = request_timeout
+        self.results         = queue.Queue()
+
+        self._jobs    = queue.PriorityQueue()
+        self._seq     = itertools.count()
+        self._lock    = threading.Lock()
+        self._version = None
+        self._data    = None
+        self._wanted  = {}      # weeks -> products still to forecast
+        self._queued  = {}      # weeks -> best priority waiting in _jobs
+        self._models  = {}      # weeks -> IncrementalForecaster
+        self._running = None
+        self._thread  = None
+
+    def reset(self, version, data, extends=False):
+        """New dataset: forget all queued work and stop the running window.
+        With `extends` (data is the previous data plus appended rows) the
+        window models are kept and extended instead of refitted."""
+        with self._lock:
+            self._version = version
+            self._data    = data
+            if not extends:
+                self._models = {}
+            self._queued.clear()
+            self._wanted.clear()
+            if self._running is not None:
+                self._running["token"].cancel()
+
+    def submit(self, train_weeks, priority, columns=None):
+        """Forecast `columns` (None: every product) of a window; "done"
+        carries only the products forecast by that run"""
+        with self._lock:
+            if self._data is None:
+                return
+            if columns is None:
+                columns = [c for c in self._data.columns if c != "Date"]
+            if not columns:
+                return
+            running = self._running
+            if running is not None and running["version"] != self._version:
+                running = None  # already cancelled by reset()
+            if (running is not None and running["weeks"] == train_weeks
+                    and set(columns) <= set(running["columns"])):
+                running["priority"] = min(running["priority"], priority)
+                return
+
+            wanted = self._wanted.setdefault(train_weeks, [])
+            wanted += [c for c in columns if c not in wanted]
+            if running is not None and running["weeks"] == train_weeks:
+                # restart it with the added products
+                priority = min(running["priority"], priority)
+                running["token"].cancel()
+
+            if priority == 0:
+                # only one window is selected: the old one becomes speculative
+                for weeks, queued in list(self._queued.items()):
+                    if queued == 0:
+                        self._queue(weeks, 1)
+                if running is not None:
+                    running["priority"] = max(1, running["priority"])
+                    running["token"].cancel()  # pre-empt, it is requeued
+
+            queued = self._queued.get(train_weeks)
+            if queued is None or priority < queued:
+                self._queue(train_weeks, priority)
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._work, daemon=True)
+            self._thread.start()
+
+    def _queue(self, train_weeks, priority):
+        # caller holds the lock; older entries for the same window are
+        # skipped when popped because _queued no longer matches them
+        self._queued[train_weeks] = priority
+        self._jobs.put((priority, next(self._seq), self._version, train_weeks))
+
+    def _work(self):
+        while True:
+            priority, _, version, weeks = self._jobs.get()
+            with self._lock:
+                if (version != self._version or not self._wanted.get(weeks)
+                        or self._queued.get(weeks) != priority):
+                    continue  # stale dataset or superseded entry
+                del self._queued[weeks]
+                token   = CancelToken(timeout=self.request_timeout)
+                columns = list(self._wanted[weeks])
+                job     = {"version": version, "weeks": weeks, "columns": columns,
+                           "priority": priority, "token": token}
+                self._running = job
+                data = self._data
+                models = self._models.setdefault(weeks, smart_models(weeks * 7))
+
+            def progress(col, res, done, total, version=version, weeks=weeks):
+                self.results.put(("progress", version, weeks, col, done, total))
+
+            try:
+                results = forecast_many(data, columns,
+                                        steps=self.steps,
+                                        train_window=weeks * 7,
+                                        token=token,
+                                        fit_timeout=self.fit_timeout,
+                                        progress=progress,
+                                        models=models)
+                with self._lock:
+                    if version == self._version:
+                        left = [c for c in self._wanted.get(weeks, [])
+                                if c not in columns]
+                        if left:
+                            self._wanted[weeks] = left
+                        else:
+                            self._wanted.pop(weeks, None)
+                self.results.put(("done", version, weeks, results))
+            except Cancelled:
+                with self._lock:
+                    if (version == self._version and self._wanted.get(weeks)
+                            and weeks not in self._queued):
+                        self._queue(weeks, job["priority"])
+            except Exception as exc:
+                self.results.put(("error", version, weeks, exc))
+            finally:
+                with self._lock:
+                    self._running = None
@@ -9,6 +9,9 @@ from login_page    import LoginPage
 from home_page     import HomePage
 from Dashboard_page import DashboardPage
 from page_two      import PageTwo
+from forecast_registry import ForecastRegistry
+from shared_data   import SharedData
+from ml.parallel   import shutdown_executor
 
 
 class App(tk.Tk):
@@ -19,8 +22,11 @@ class App(tk.Tk):
         self.minsize(960, 640)
         self.configure(bg="#111111")
 
-        # Shared data store : Dashboard writes here; PageTwo reads it
-        self.shared_data = None
+        # Shared data store : Dashboard writes here; PageTwo reads it.
+        # Its version goes up on every upload; forecasts are shared per
+        # (version, product)
+        self.shared_data = SharedData()
+        self.forecasts   = ForecastRegistry()
 
         # Centre on screen
         self.update_idletasks()
@@ -85,3 +91,4 @@ class App(tk.Tk):
 if __name__ == "__main__":
     app = App()
     app.mainloop()
+    shutdown_executor()
@@ -1,10 +1,13 @@
 from base_page import BasePage
 import tkinter as tk
+import threading
+import queue
 from tkinter import ttk, messagebox
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from chart_layer import ChartLayer
 import numpy as np
 import sys
 import os
@@ -14,7 +17,8 @@ try:
     parent_dir = os.path.dirname(current_dir)
     if parent_dir not in sys.path:
         sys.path.append(parent_dir)
-    from ml.advanced_forecasting import AdvancedForecaster
+    from ml import forecast_many, score_many, ProductForecast
+    from ml.parallel import CancelToken
     ML_AVAILABLE = True
 except ImportError as e:
     print(f"[PageTwo] ML module not available: {e}")
@@ -32,6 +36,10 @@ FG_PRIMARY   = "#FFFFFF"
 FG_SECONDARY = "#AAAAAA"
 FG_MUTED     = "#555555"
 
+FIT_TIMEOUT     = 15   # seconds any single SARIMA fit may take
+REQUEST_TIMEOUT = 90   # seconds for all metric fits together
+POLL_MS         = 50   # how often the Tk thread checks for worker results
+
 CHART_COLORS = [ACCENT_PINK, ACCENT_BLUE, ACCENT_GREEN, ACCENT_AMB, ACCENT_PURP]
 
 
@@ -86,7 +94,12 @@ class PageTwo(BasePage):
         self.config(bg=DARK_BG)
         self.content.config(bg=DARK_BG)
 
-        self.forecaster = AdvancedForecaster() if ML_AVAILABLE else None
+        # section name -> shared_data.version it was last rendered for
+        self._rendered = {}
+        # section name -> (version, data computed by the worker)
+        self._payloads = {}
+        self._job = None
+        self._prefetch_id = None
         self._build_header()
         self._build_tabs()
         self._build_footer()
@@ -117,7 +130,7 @@ class PageTwo(BasePage):
             font=("Helvetica", 9, "bold"),
             bg=ACCENT_BLUE, fg=FG_PRIMARY,
             padx=16, pady=8, bd=0, relief="flat", cursor="hand2",
-            command=self.refresh_analytics,
+            command=lambda: self.refresh_analytics(force=True),
         )
         ref_btn.pack(side="right", padx=8)
         ref_btn.bind("<Enter>", lambda e: ref_btn.config(bg="#2980B9"))
@@ -138,10 +151,27 @@ class PageTwo(BasePage):
         self.nb = ttk.Notebook(self.content, style="BI.TNotebook")
         self.nb.pack(fill="both", expand=True, padx=30, pady=0)
 
-        self._tab_overview()
-        self._tab_performance()
-        self._tab_trends()
-        self._tab_recommendations()
+        # (name, compute on the worker, render on the Tk thread), in the
+        # order they are computed: KPIs, then charts, then model metrics
+        self._sections = [
+            ("kpis",            self._compute_kpis,            self._render_kpis),
+            ("daily",           self._compute_daily_chart,     self._render_daily_chart),
+            ("pie",             self._compute_pie,             self._render_pie),
+            ("performance",     self._compute_performance,     self._render_performance),
+            ("trends",          self._compute_trends,          self._render_trends),
+            ("recommendations", self._compute_recommendations, self._render_recommendations),
+        ]
+        self._renderers = {name: render for name, _, render in self._sections}
+
+        # Each tab is drawn when first shown for a data version; the
+        # others are filled in at idle time
+        self._tab_sections = {
+            str(self._tab_overview()):        ["kpis", "daily", "pie"],
+            str(self._tab_performance()):     ["performance"],
+            str(self._tab_trends()):          ["trends"],
+            str(self._tab_recommendations()): ["recommendations"],
+        }
+        self.nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
     def _tab_overview(self):
         frm = tk.Frame(self.nb, bg=CARD_BG)
@@ -167,6 +197,9 @@ class PageTwo(BasePage):
         _styled_ax(self.daily_ax, PANEL_BG)
         self.daily_canvas = FigureCanvasTkAgg(self.daily_fig, left_wrap)
         self.daily_canvas.get_tk_widget().pack(fill="both", expand=True, padx=8, pady=8)
+        self.daily_layer = ChartLayer(self.daily_ax, self.daily_canvas,
+                                      legend=dict(fontsize=7, framealpha=0.1,
+                                                  facecolor=PANEL_BG, edgecolor="#333"))
 
         # Right – product split
         right_wrap = tk.Frame(charts, bg=PANEL_BG,
@@ -179,6 +212,7 @@ class PageTwo(BasePage):
         self.pie_ax  = self.pie_fig.add_subplot(111)
         self.pie_canvas = FigureCanvasTkAgg(self.pie_fig, right_wrap)
         self.pie_canvas.get_tk_widget().pack(fill="both", expand=True, padx=8, pady=8)
+        return frm
 
     # TAB 2: PERFORMANCE 
     def _tab_performance(self):
@@ -213,10 +247,12 @@ class PageTwo(BasePage):
         _styled_ax(self.perf_ax, PANEL_BG)
         self.perf_canvas = FigureCanvasTkAgg(self.perf_fig, chart_wrap)
         self.perf_canvas.get_tk_widget().pack(fill="both", expand=True, padx=8, pady=8)
+        self.perf_layer = ChartLayer(self.perf_ax, self.perf_canvas)
 
         # Table container
         self.perf_table_frame = tk.Frame(self.perf_inner, bg=CARD_BG)
         self.perf_table_frame.pack(fill="x", padx=20, pady=8)
+        return frm
 
     def _tab_trends(self):
         frm = tk.Frame(self.nb, bg=CARD_BG)
@@ -236,6 +272,7 @@ class PageTwo(BasePage):
         _styled_ax(self.weekly_ax, PANEL_BG)
         self.weekly_canvas = FigureCanvasTkAgg(self.weekly_fig, weekly_wrap)
         self.weekly_canvas.get_tk_widget().pack(fill="both", expand=True, padx=8, pady=8)
+        self.weekly_layer = ChartLayer(self.weekly_ax, self.weekly_canvas)
 
         # Insights text card
         insights_wrap = tk.Frame(top, bg=PANEL_BG,
@@ -250,6 +287,7 @@ class PageTwo(BasePage):
             insertbackground=ACCENT_PINK,
         )
         self.insights_text.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+        return frm
 
     def _tab_recommendations(self):
         frm = tk.Frame(self.nb, bg=CARD_BG)
@@ -277,6 +315,7 @@ class PageTwo(BasePage):
             wrap="word", relief="flat", padx=16, pady=12,
         )
         self.rec_text.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+        return frm
 
     #  Footer 
     def _build_footer(self):
@@ -289,21 +328,46 @@ class PageTwo(BasePage):
         ).pack(side="left")
 
     #  Data routing 
-    def refresh_analytics(self):
-        """Pull data from controller. Show empty state if no data uploaded yet."""
-        data = getattr(self.controller, "shared_data", None)
-
-        if data is None or (hasattr(data, "empty") and data.empty):
-            self.data_source_lbl.config(text="● No data loaded", fg=FG_MUTED)
-            self._show_empty_state()
+    def refresh_analytics(self, force=False):
+        """Pull data from controller. Show empty state if no data uploaded yet.
+        Section data is computed on a worker (KPIs, then charts, then model
+        metrics) and each section is drawn as soon as its data arrives, if
+        its tab is visible, or at idle time otherwise. Sections already
+        drawn for the current data version are skipped unless `force` is
+        set (the Refresh button)."""
+        shared = self.controller.shared_data
+        if force:
+            self._rendered = {}
+            self._payloads = {}
+            if self._job is not None:
+                self._cancel(self._job)   # its fits would hold pool workers
+            self._job = None
+
+        if shared.empty:
+            if self._rendered.get("empty") != shared.version:
+                self.data_source_lbl.config(text="● No data loaded", fg=FG_MUTED)
+                self._show_empty_state()
+                self._rendered = {"empty": shared.version}
             return
 
-        self.data_source_lbl.config(text=f"● Live data ({len(data)} rows)",
+        store, version = shared.store, shared.version
+        self._rendered.pop("empty", None)
+        self.data_source_lbl.config(text=f"● Live data ({len(store)} rows)",
                                     fg=ACCENT_GREEN)
-        try:
-            self._render_all(data)
-        except Exception as exc:
-            print(f"[PageTwo] refresh error: {exc}")
+
+        ready = all(self._payloads.get(name, (None,))[0] == version
+                    for name, _, _ in self._sections)
+        running = self._job is not None and self._job["version"] == version
+        if not ready and not running:
+            self._start_pipeline(store, version)
+
+        self._render_tab(self.nb.select(), version)
+        self._schedule_prefetch()
+
+    def _on_tab_changed(self, event=None):
+        shared = self.controller.shared_data
+        if not shared.empty:
+            self._render_tab(self.nb.select(), shared.version)
 
     def _show_empty_state(self):
         """Show a clear prompt when no CSV has been uploaded yet."""
@@ -312,6 +376,8 @@ class PageTwo(BasePage):
             w.destroy()
 
         # Clear charts
+        for layer in (self.daily_layer, self.perf_layer, self.weekly_layer):
+            layer.clear()
         for ax, canvas in [(self.daily_ax, self.daily_canvas),
                            (self.pie_ax,   self.pie_canvas),
                            (self.perf_ax,  self.perf_canvas),
@@ -357,70 +423,175 @@ class PageTwo(BasePage):
                  font=("Helvetica", 9, "italic"),
                  fg="#444444", bg=CARD_BG).pack()
 
-    def _render_all(self, data):
-        data = data.copy()
-        data["Date"] = pd.to_datetime(data["Date"], errors="coerce")
-        product_cols = [c for c in data.columns if c != "Date"]
+    #  Staged pipeline 
+    def _start_pipeline(self, store, version):
+        """Compute every section's data on a worker thread, in commit
+        order; results are picked up by _poll_pipeline."""
+        if self._job is not None:
+            self._cancel(self._job)   # results for older data are stale
+        # the pipeline itself needs no ml, the token only stops model fits
+        token = CancelToken(timeout=REQUEST_TIMEOUT) if ML_AVAILABLE else None
+
+        # Registry lookups stay on the Tk thread; the worker only fits
+        # what is missing
+        registry = self.controller.forecasts
+        known = {col: registry.with_metrics(version, col, "MAPE", "MAE")
+                 for col in store.products[:4]}
+        # the Dashboard's forecasts only lack the metrics
+        forecasts = {col: registry.with_metrics(version, col, "Train_Std")
+                     for col, res in known.items() if res is None}
+        job = {"version": version, "token": token, "known": known,
+               "forecasts": forecasts, "queue": queue.Queue(),
+               "cancelled": threading.Event()}
+        self._job = job
+        self._show_metrics_pending()
+
+        def work():
+            for name, compute, _ in self._sections:
+                if job["cancelled"].is_set():
+                    return
+                try:
+                    payload = compute(store, job)
+                except Exception as exc:
+                    if job["cancelled"].is_set():
+                        return  # e.g. Cancelled from a model fit
+                    print(f"[PageTwo] {name}: {exc}")
+                    continue
+                job["queue"].put((name, payload))
+            job["queue"].put(("done", None))
+
+        threading.Thread(target=work, daemon=True).start()
+        self.after(POLL_MS, self._poll_pipeline, job)
+
+    def _poll_pipeline(self, job):
+        """Runs on the Tk thread: draw visible sections as their data lands."""
+        if job is not self._job:
+            return  # superseded by newer data or a forced refresh
+        if job["version"] != self.controller.shared_data.version:
+            self._cancel(job)  # a new file was loaded meanwhile
+            self._job = None
+            return
 
-        self._render_kpis(data, product_cols)
-        self._render_daily_chart(data, product_cols)
-        self._render_pie(data, product_cols)
-        self._render_performance(data, product_cols)
-        self._render_trends(data, product_cols)
-        self._render_recommendations(data, product_cols)
+        visible = self._tab_sections.get(str(self.nb.select()), [])
+        try:
+            while True:
+                name, payload = job["queue"].get_nowait()
+                if name == "done":
+                    self._job = None
+                    return
+                self._payloads[name] = (job["version"], payload)
+                if name in visible:
+                    self._commit(name, job["version"])
+                else:
+                    self._schedule_prefetch()
+        except queue.Empty:
+            pass
+
+        self.after(POLL_MS, self._poll_pipeline, job)
+
+    def _cancel(self, job):
+        job["cancelled"].set()
+        if job["token"] is not None:
+            job["token"].cancel()
+
+    def _commit(self, name, version):
+        """Draw one section if its data for `version` is in and not drawn yet"""
+        got = self._payloads.get(name)
+        if got is None or got[0] != version or self._rendered.get(name) == version:
+            return False
+        try:
+            self._renderers[name](got[1])
+        except Exception as exc:
+            print(f"[PageTwo] refresh error: {exc}")
+        self._rendered[name] = version
+        return True
+
+    def _render_tab(self, tab, version):
+        """Draw the sections of one tab whose data is ready"""
+        for name in self._tab_sections.get(str(tab), []):
+            self._commit(name, version)
+
+    def _schedule_prefetch(self):
+        if self._prefetch_id is None:
+            self._prefetch_id = self.after_idle(self._prefetch)
+
+    def _prefetch(self):
+        """Draw one ready section of a hidden tab, then give Tk back
+        control; reschedules itself until every tab is current."""
+        self._prefetch_id = None
+        shared = self.controller.shared_data
+        if shared.empty:
+            return
+        for tab in self.nb.tabs():
+            for name in self._tab_sections.get(str(tab), []):
+                if self._commit(name, shared.version):
+                    self._schedule_prefetch()
+                    return
 
-    def _render_kpis(self, data, product_cols):
+    def _show_metrics_pending(self):
+        for w in self.metrics_container.winfo_children():
+            w.destroy()
+        tk.Label(self.metrics_container, text="Computing model metrics...",
+                 font=("Helvetica", 10, "italic"), fg=FG_MUTED, bg=PANEL_BG,
+                 pady=20).pack()
+
+    #  Overview: compute on the worker, render on the Tk thread 
+    def _compute_kpis(self, store, job):
+        total = store.total_stats()["sum"]
+        return {"total": total,
+                "avg":   total / max(len(store), 1),
+                "best":  store.total_stats()["max"],
+                "waste": self._waste_pct(store),
+                "trend": self._overall_trend(store)}
+
+    def _render_kpis(self, kpi):
         for w in self.kpi_row.winfo_children():
             w.destroy()
 
-        total = sum(pd.to_numeric(data[c], errors="coerce").sum() for c in product_cols)
-        avg   = total / max(len(data), 1)
-        data["_tot"] = sum(pd.to_numeric(data[c], errors="coerce").fillna(0)
-                           for c in product_cols)
-        best  = data["_tot"].max()
-        waste = self._waste_pct(data, product_cols)
-        trend = self._overall_trend(data)
-
-        _kpi_card(self.kpi_row, "Total Units Sold", f"{int(total):,}", "all products", ACCENT_PINK)
-        _kpi_card(self.kpi_row, "Avg Daily Sales",  f"{avg:.0f}", "units/day", ACCENT_BLUE)
-        _kpi_card(self.kpi_row, "Peak Day",         f"{int(best)}", "max units sold", ACCENT_GREEN)
-        _kpi_card(self.kpi_row, "Demand Variability", f"{waste:.0f}%", "waste reduction target", ACCENT_AMB)
-        _kpi_card(self.kpi_row, "Trend",            trend, "recent vs earlier", ACCENT_PURP)
-
-    def _render_daily_chart(self, data, product_cols):
-        self.daily_ax.clear()
-        _styled_ax(self.daily_ax, PANEL_BG)
-
-        data["_tot"] = sum(pd.to_numeric(data[c], errors="coerce").fillna(0)
-                           for c in product_cols)
-        last30 = data.tail(30)
+        _kpi_card(self.kpi_row, "Total Units Sold", f"{int(kpi['total']):,}", "all products", ACCENT_PINK)
+        _kpi_card(self.kpi_row, "Avg Daily Sales",  f"{kpi['avg']:.0f}", "units/day", ACCENT_BLUE)
+        _kpi_card(self.kpi_row, "Peak Day",         f"{int(kpi['best'])}", "max units sold", ACCENT_GREEN)
+        _kpi_card(self.kpi_row, "Demand Variability", f"{kpi['waste']:.0f}%", "waste reduction target", ACCENT_AMB)
+        _kpi_card(self.kpi_row, "Trend",            kpi["trend"], "recent vs earlier", ACCENT_PURP)
 
-        self.daily_ax.plot(last30["Date"], last30["_tot"],
-                           color=ACCENT_PINK, linewidth=2, zorder=3)
-        self.daily_ax.fill_between(last30["Date"], 0, last30["_tot"],
-                                   color=ACCENT_PINK, alpha=0.12)
+    def _compute_daily_chart(self, store, job):
+        dates, tot = store.dates[-30:], store.total[-30:]
         # 7-day rolling avg
-        roll = last30["_tot"].rolling(7, min_periods=1).mean()
-        self.daily_ax.plot(last30["Date"], roll,
-                           color=ACCENT_AMB, linewidth=1.2, linestyle="--",
-                           label="7-day avg")
-        self.daily_ax.legend(fontsize=7, framealpha=0.1,
-                             facecolor=PANEL_BG, edgecolor="#333")
-        self.daily_ax.set_ylabel("Units Sold", color=FG_SECONDARY, fontsize=8)
-        self.daily_fig.autofmt_xdate(rotation=25)
-        self.daily_fig.tight_layout()
-        self.daily_canvas.draw()
-
-    def _render_pie(self, data, product_cols):
-        self.pie_ax.clear()
-        self.pie_fig.patch.set_facecolor(PANEL_BG)
-
+        roll = pd.Series(tot).rolling(7, min_periods=1).mean().to_numpy()
+        return dates, tot, roll
+
+    def _render_daily_chart(self, daily):
+        dates, tot, roll = daily
+        layer = self.daily_layer
+        if layer.empty:
+            self.daily_ax.clear()
+            _styled_ax(self.daily_ax, PANEL_BG)
+            self.daily_ax.set_ylabel("Units Sold", color=FG_SECONDARY, fontsize=8)
+            self.daily_fig.autofmt_xdate(rotation=25)
+
+        layer.begin()
+        layer.line("total", dates, tot,
+                   color=ACCENT_PINK, linewidth=2, zorder=3)
+        layer.band("fill", dates, np.zeros(len(tot)), tot,
+                   color=ACCENT_PINK, alpha=0.12)
+        layer.line("roll", dates, roll,
+                   color=ACCENT_AMB, linewidth=1.2, linestyle="--",
+                   label="7-day avg")
+        layer.finish()
+
+    def _compute_pie(self, store, job):
         labels, vals = [], []
-        for col in product_cols[:6]:
-            v = pd.to_numeric(data[col], errors="coerce").sum()
+        for col in store.products[:6]:
+            v = store.stats(col)["sum"]
             if v > 0:
                 labels.append(col)
                 vals.append(v)
+        return labels, vals
+
+    def _render_pie(self, pie):
+        labels, vals = pie
+        self.pie_ax.clear()
+        self.pie_fig.patch.set_facecolor(PANEL_BG)
 
         if vals:
             wedges, texts, autotexts = self.pie_ax.pie(
@@ -442,38 +613,50 @@ class PageTwo(BasePage):
                                facecolor=PANEL_BG, edgecolor="#333",
                                ncol=2, bbox_to_anchor=(0.5, -0.08))
 
+        # wedge geometry changes with the data, so the pie is rebuilt
         self.pie_fig.tight_layout()
-        self.pie_canvas.draw()
+        self.pie_canvas.draw_idle()
 
     #  Performance rendering 
-    def _render_performance(self, data, product_cols):
+    def _compute_performance(self, store, job):
+        product_cols = store.products[:6]
+        totals = [store.stats(c)["sum"] for c in product_cols]
+        rows = []
+        for col in product_cols:
+            st = store.stats(col)
+            if st["count"] == 0:
+                continue
+            cv = (st["std"] / st["mean"] * 100) if st["mean"] > 0 else 0
+            rows.append((col, st, cv, self._trend_arrow(store.observed(col))))
+        return product_cols, totals, rows
+
+    def _render_performance(self, perf):
+        product_cols, totals, rows = perf
         # Clear existing
         for w in self.perf_table_frame.winfo_children():
             w.destroy()
 
         # Bar chart
-        self.perf_ax.clear()
-        _styled_ax(self.perf_ax, PANEL_BG)
+        layer = self.perf_layer
+        if layer.empty:
+            self.perf_ax.clear()
+            _styled_ax(self.perf_ax, PANEL_BG)
+            self.perf_ax.set_ylabel("Total Units Sold", color=FG_SECONDARY, fontsize=8)
 
-        totals = [pd.to_numeric(data[c], errors="coerce").sum() for c in product_cols[:6]]
-        x = range(len(product_cols[:6]))
-        bars = self.perf_ax.bar(x, totals,
-                                color=CHART_COLORS[:len(product_cols[:6])],
-                                width=0.6, edgecolor=PANEL_BG, linewidth=1.2)
-        self.perf_ax.set_xticks(list(x))
-        self.perf_ax.set_xticklabels(product_cols[:6],
-                                     color=FG_SECONDARY, fontsize=9, rotation=15)
-        self.perf_ax.set_ylabel("Total Units Sold", color=FG_SECONDARY, fontsize=8)
+        layer.begin()
+        bars = layer.bars("bars", totals, CHART_COLORS[:len(product_cols)],
+                          width=0.6, edgecolor=PANEL_BG, linewidth=1.2)
+        layer.xticklabels(product_cols, color=FG_SECONDARY, fontsize=9, rotation=15)
 
         # Value labels on bars
-        for bar, val in zip(bars, totals):
-            self.perf_ax.text(bar.get_x() + bar.get_width() / 2,
-                              bar.get_height() + 5,
-                              f"{int(val):,}",
-                              ha="center", va="bottom",
-                              color=FG_SECONDARY, fontsize=8)
-        self.perf_fig.tight_layout()
-        self.perf_canvas.draw()
+        for i, (bar, val) in enumerate(zip(bars, totals)):
+            layer.text(("value", i),
+                       bar.get_x() + bar.get_width() / 2,
+                       bar.get_height() + 5,
+                       f"{int(val):,}",
+                       ha="center", va="bottom",
+                       color=FG_SECONDARY, fontsize=8)
+        layer.finish()
 
         # Data table
         headers = ["Product", "Total Sold", "Avg/Day", "Std Dev", "Trend", "Variability"]
@@ -484,20 +667,13 @@ class PageTwo(BasePage):
                      fg=ACCENT_PINK, bg="#2A2A2A",
                      padx=14, pady=8).pack(side="left", expand=True, fill="x")
 
-        for idx, col in enumerate(product_cols[:6]):
-            series = pd.to_numeric(data[col], errors="coerce").dropna()
-            if len(series) == 0:
-                continue
-
+        for idx, (col, st, cv, trend) in enumerate(rows):
             bg = CARD_BG if idx % 2 == 0 else "#242424"
             row = tk.Frame(self.perf_table_frame, bg=bg)
             row.pack(fill="x", pady=1)
 
-            cv = (series.std() / series.mean() * 100) if series.mean() > 0 else 0
-            trend = self._trend_arrow(series)
-
-            vals = [col, f"{int(series.sum()):,}", f"{series.mean():.1f}",
-                    f"{series.std():.1f}", trend, f"{cv:.1f}%"]
+            vals = [col, f"{int(st['sum']):,}", f"{st['mean']:.1f}",
+                    f"{st['std']:.1f}", trend, f"{cv:.1f}%"]
             colors = [FG_PRIMARY, FG_SECONDARY, FG_SECONDARY, FG_SECONDARY,
                       ACCENT_GREEN if "↑" in trend else (
                           "#E74C3C" if "↓" in trend else FG_MUTED),
@@ -509,56 +685,74 @@ class PageTwo(BasePage):
                     side="left", expand=True, fill="x")
 
     #  Trends rendering 
-    def _render_trends(self, data, product_cols):
-        self.weekly_ax.clear()
-        _styled_ax(self.weekly_ax, PANEL_BG)
+    def _compute_trends(self, store, job):
+        return pd.Series(store.dow_means()), self._generate_insights(store)
+
+    def _render_trends(self, trends):
+        weekly, insights = trends
+        layer = self.weekly_layer
+        if layer.empty:
+            self.weekly_ax.clear()
+            _styled_ax(self.weekly_ax, PANEL_BG)
+            self.weekly_ax.set_ylabel("Avg Units Sold", color=FG_SECONDARY, fontsize=8)
+            wkd_lbl = mpatches.Patch(color=ACCENT_BLUE, label="Weekday")
+            wke_lbl = mpatches.Patch(color=ACCENT_PINK, label="Weekend")
+            self.weekly_ax.legend(handles=[wkd_lbl, wke_lbl],
+                                  fontsize=7, framealpha=0.1,
+                                  facecolor=PANEL_BG, edgecolor="#333")
 
-        data["_tot"] = sum(pd.to_numeric(data[c], errors="coerce").fillna(0)
-                           for c in product_cols)
-        data["_dow"] = data["Date"].dt.dayofweek
         day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
-        weekly = data.groupby("_dow")["_tot"].mean()
-
+        layer.begin()
         if len(weekly) > 0:
             bar_colors = [ACCENT_PINK if i >= 5 else ACCENT_BLUE
                           for i in weekly.index]
-            bars = self.weekly_ax.bar(
-                range(len(weekly)), weekly.values,
-                color=bar_colors, width=0.65,
-                edgecolor=PANEL_BG, linewidth=1.5,
-            )
-            self.weekly_ax.set_xticks(range(len(weekly)))
-            self.weekly_ax.set_xticklabels(
-                [day_names[i] for i in weekly.index],
-                color=FG_SECONDARY, fontsize=9,
-            )
-            self.weekly_ax.set_ylabel("Avg Units Sold", color=FG_SECONDARY, fontsize=8)
+            layer.bars("bars", weekly.values, bar_colors, width=0.65,
+                       edgecolor=PANEL_BG, linewidth=1.5)
+            layer.xticklabels([day_names[i] for i in weekly.index],
+                              color=FG_SECONDARY, fontsize=9)
 
             # Peak annotation
             peak_idx = weekly.values.argmax()
-            self.weekly_ax.annotate(
-                "PEAK",
-                xy=(peak_idx, weekly.values[peak_idx]),
-                xytext=(peak_idx, weekly.values[peak_idx] * 1.08),
-                fontsize=7, color=ACCENT_PINK, ha="center",
-            )
-
-            wkd_lbl = mpatches.Patch(color=ACCENT_BLUE, label="Weekday")
-            wke_lbl = mpatches.Patch(color=ACCENT_PINK, label="Weekend")
-            self.weekly_ax.legend(handles=[wkd_lbl, wke_lbl],
-                                  fontsize=7, framealpha=0.1,
-                                  facecolor=PANEL_BG, edgecolor="#333")
-
-        self.weekly_fig.tight_layout()
-        self.weekly_canvas.draw()
+            layer.text("peak", peak_idx, weekly.values[peak_idx] * 1.08, "PEAK",
+                       fontsize=7, color=ACCENT_PINK, ha="center")
+        layer.finish()
 
         # Insights text
         self.insights_text.delete(1.0, tk.END)
-        self.insights_text.insert(1.0, self._generate_insights(data, product_cols))
+        self.insights_text.insert(1.0, insights)
 
     #  Recommendations rendering 
-    def _render_recommendations(self, data, product_cols):
+    def _compute_recommendations(self, store, job):
+        """Model metrics for up to four products. Products with MAPE/MAE
+        already in the registry (job["known"]) are reused, products the
+        Dashboard has forecast only get the holdout fit for their metrics;
+        the rest are fitted here, on the worker."""
+        results, fresh = dict(job["known"]), {}
+        missing = [col for col, res in results.items() if res is None]
+        if ML_AVAILABLE and missing:
+            data = store.frame()
+            scored = [col for col in missing if job["forecasts"].get(col)]
+            if scored:
+                scores = score_many(data, scored, token=job["token"],
+                                    fit_timeout=FIT_TIMEOUT)
+                for col, metrics in scores.items():
+                    if metrics is None:
+                        continue
+                    res = job["forecasts"][col]
+                    fresh[col] = ProductForecast(col, res.values, res.dates, res.method,
+                                                 {**res.metrics, **metrics})
+            missing = [col for col in missing if col not in scored]
+            if missing:
+                fresh.update(forecast_many(data, missing, steps=7,
+                                           method="advanced", token=job["token"],
+                                           fit_timeout=FIT_TIMEOUT))
+            results.update(fresh)
+        return {"version": job["version"], "products": store.products[:4],
+                "results": results, "fresh": fresh,
+                "text": self._generate_recommendations(store)}
+
+    def _render_recommendations(self, rec):
         # Clear metrics container
         for w in self.metrics_container.winfo_children():
             w.destroy()
@@ -571,14 +765,17 @@ class PageTwo(BasePage):
                      fg=ACCENT_PINK, bg="#2A2A2A",
                      padx=10, pady=6).pack(side="left", expand=True, fill="x")
 
-        if ML_AVAILABLE and self.forecaster:
-            for idx, col in enumerate(product_cols[:4]):
+        if ML_AVAILABLE:
+            for res in rec["fresh"].values():
+                if res.ok:
+                    variant = ("holdout",) if "Train_Std" in res.metrics else ("advanced", 7)
+                    self.controller.forecasts.put(rec["version"], variant, res)
+            for idx, col in enumerate(rec["products"]):
                 try:
-                    series_df = self.forecaster.prepare_series(data, col)
-                    if series_df is None:
+                    res = rec["results"].get(col)
+                    if res is None or not res.ok:
                         continue
-                    _, metrics = self.forecaster.sarima_forecast(
-                        series_df, steps=7, product_name=col)
+                    metrics = res.metrics
 
                     mape   = metrics.get("MAPE", 0)
                     mae    = metrics.get("MAE", 0)
@@ -616,83 +813,74 @@ class PageTwo(BasePage):
 
         # Recommendations text
         self.rec_text.delete(1.0, tk.END)
-        self.rec_text.insert(1.0, self._generate_recommendations(data, product_cols))
+        self.rec_text.insert(1.0, rec["text"])
 
     #  Analytics helpers 
-    def _waste_pct(self, data, product_cols):
+    def _waste_pct(self, store):
         cvs = []
-        for col in product_cols:
-            s = pd.to_numeric(data[col], errors="coerce").dropna()
-            if len(s) >= 7 and s.mean() > 0:
-                cvs.append(s.std() / s.mean() * 100)
+        for col in store.products:
+            st = store.stats(col)
+            if st["count"] >= 7 and st["mean"] > 0:
+                cvs.append(st["std"] / st["mean"] * 100)
         return min(40, np.mean(cvs)) if cvs else 0
 
-    def _overall_trend(self, data):
-        data["_tot"] = sum(pd.to_numeric(data[c], errors="coerce").fillna(0)
-                           for c in [c for c in data.columns if c not in ("Date", "_tot")])
-        if len(data) < 14:
+    def _overall_trend(self, store):
+        tot = store.total
+        if len(tot) < 14:
             return "—"
-        recent  = data["_tot"].tail(14).mean()
-        earlier = data["_tot"].tail(28).head(14).mean() if len(data) >= 28 else \
-                  data["_tot"].head(max(1, len(data) - 14)).mean()
+        recent  = tot[-14:].mean()
+        earlier = tot[-28:-14].mean() if len(tot) >= 28 else \
+                  tot[:max(1, len(tot) - 14)].mean()
         if recent > earlier * 1.08:
             return " Rising"
         elif recent < earlier * 0.92:
             return " Falling"
         return " Stable"
 
-    def _trend_arrow(self, series):
-        if len(series) < 14:
+    def _trend_arrow(self, values):
+        if len(values) < 14:
             return "—"
-        recent  = series.tail(14).mean()
-        earlier = series.tail(28).head(14).mean() if len(series) >= 28 else series.head(len(series) - 14).mean()
+        recent  = values[-14:].mean()
+        earlier = values[-28:-14].mean() if len(values) >= 28 else values[:len(values) - 14].mean()
         if recent > earlier * 1.08:
             return " Up"
         elif recent < earlier * 0.92:
             return " Down"
         return " Stable"
 
-    def _generate_insights(self, data, product_cols):
+    def _generate_insights(self, store):
         lines = []
-        data["_tot"] = sum(pd.to_numeric(data[c], errors="coerce").fillna(0) for c in product_cols)
-        data["_day"] = data["Date"].dt.day_name()
-        data["_dow"] = data["Date"].dt.dayofweek
-
-        daily_avg = data.groupby("_day")["_tot"].mean()
+        day_names = ["Monday", "Tuesday", "Wednesday", "Thursday",
+                     "Friday", "Saturday", "Sunday"]
+        daily_avg = pd.Series({day_names[d]: v for d, v in store.dow_means().items()})
         if len(daily_avg) > 0:
             best  = daily_avg.idxmax()
             worst = daily_avg.idxmin()
             lines.append(f"• Best sales day: {best} (avg {daily_avg.max():.0f} units)")
             lines.append(f"• Lowest sales day: {worst} (avg {daily_avg.min():.0f} units)")
 
-        wknd = data[data["_dow"] >= 5]["_tot"].mean()
-        wkdy = data[data["_dow"] < 5]["_tot"].mean()
+        wkdy, wknd = store.weekday_weekend_means()
         if wkdy > 0:
             diff = (wknd - wkdy) / wkdy * 100
             direction = "higher" if diff > 0 else "lower"
             lines.append(f"• Weekend demand is {abs(diff):.0f}% {direction} than weekdays")
 
-        cv = (data["_tot"].std() / data["_tot"].mean() * 100) if data["_tot"].mean() > 0 else 0
+        tot = store.total_stats()
+        cv = (tot["std"] / tot["mean"] * 100) if tot["mean"] > 0 else 0
         if cv > 35:
             lines.append(f"• Demand variability is HIGH ({cv:.0f}%), daily adjustments recommended")
         elif cv < 20:
             lines.append(f"• Demand is STABLE ({cv:.0f}%), well-suited to weekly batch planning")
 
-        lines.append(f"• Dataset spans {len(data)} days of sales history")
+        lines.append(f"• Dataset spans {len(store)} days of sales history")
         lines.append(f"• SARIMA model trained with weekly (7-day) seasonal cycle")
         lines.append(f"• ML forecasting: {'Active' if ML_AVAILABLE else 'Not available'}")
 
         return "\n".join(lines) if lines else "No insights available."
 
-    def _generate_recommendations(self, data, product_cols):
+    def _generate_recommendations(self, store):
         rec = []
-        data = data.copy()
-        data["Date"] = pd.to_datetime(data["Date"], errors="coerce")
-        data["_tot"] = sum(pd.to_numeric(data[c], errors="coerce").fillna(0) for c in product_cols)
-        data["_dow"] = data["Date"].dt.dayofweek
-
-        wknd = data[data["_dow"] >= 5]["_tot"].mean()
-        wkdy = data[data["_dow"] < 5]["_tot"].mean()
+        wkdy, wknd = store.weekday_weekend_means()
 
         rec.append("OPERATIONAL RECOMMENDATIONS\n")
 
@@ -712,10 +900,10 @@ class PageTwo(BasePage):
                 rec.append(f"-> Maintain consistent production levels.\n")
 
         rec.append("2. PRODUCT-LEVEL STRATEGY")
-        for col in product_cols[:3]:
-            s = pd.to_numeric(data[col], errors="coerce").dropna()
-            if len(s) > 7:
-                cv = (s.std() / s.mean() * 100) if s.mean() > 0 else 0
+        for col in store.products[:3]:
+            st = store.stats(col)
+            if st["count"] > 7:
+                cv = (st["std"] / st["mean"] * 100) if st["mean"] > 0 else 0
                 if cv > 40:
                     rec.append(f"• {col}:HIGH variability ({cv:.0f}%), use daily SARIMA forecasts")
                 elif cv < 20:
@@ -732,7 +920,7 @@ class PageTwo(BasePage):
 
         rec.append("")
         rec.append("4. DATA & MODEL QUALITY")
-        days = len(data)
+        days = len(store)
         if days < 60:
             rec.append(f"Only {days} days of data loaded, 60+ days strongly recommended")
         else:
@@ -0,0 +1,20 @@
+class SharedData:
+    """
+    The uploaded sales data (an ml.SalesStore) plus a version that goes up
+    on every change, so a page can tell whether what it last drew is
+    still current.
+    """
+
+    def __init__(self, store=None):
+        self.store   = store
+        self.version = 0
+
+    def set(self, store):
+        """Replace the store and return the new version"""
+        self.store = store
+        self.version += 1
+        return self.version
+
+    @property
+    def empty(self):
+        return self.store is None or len(self.store) == 0
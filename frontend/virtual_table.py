@@ -0,0 +1,138 @@
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+import pandas as pd
+
+HEADING_HEIGHT = 26   # px taken by the Treeview heading row
+WHEEL_ROWS     = 3    # rows per mouse-wheel notch
+
+
+def _cell(v):
+    if np.isnan(v):
+        return ""
+    return f"{v:.0f}" if float(v).is_integer() else f"{v:.1f}"
+
+
+class VirtualTable(tk.Frame):
+    """
+    Treeview over every row of a SalesStore that only materialises the
+    rows in view. It keeps one item per visible row and rewrites their
+    values from the store's arrays when the view moves, so the number of
+    rows in the file does not matter. The vertical scrollbar, mouse wheel,
+    page() and jump_to_date() all move the first visible row; `status`
+    holds "Rows a-b of n".
+    """
+
+    def __init__(self, parent, row_height=24, **tree_options):
+        super().__init__(parent, bg=parent["bg"])
+        self.row_height = row_height
+        self.status     = tk.StringVar(value="")
+        self._store = None
+        self._first = 0      # index of the top visible row
+        self._rows  = 1      # rows that fit in the viewport
+        self._items = []     # reused Treeview items, top to bottom
+
+        hs = tk.Scrollbar(self, orient=tk.HORIZONTAL)
+        self._vs = tk.Scrollbar(self, orient=tk.VERTICAL,
+                                command=self._on_scrollbar)
+        self.tree = ttk.Treeview(self, show="headings",
+                                 xscrollcommand=hs.set, **tree_options)
+        hs.config(command=self.tree.xview)
+        hs.pack(side="bottom", fill="x")
+        self._vs.pack(side="right", fill="y")
+        self.tree.pack(fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(seq, self._on_wheel)
+        self.tree.bind("<Prior>", lambda e: self._key(self.page, -1))
+        self.tree.bind("<Next>",  lambda e: self._key(self.page, 1))
+        self.tree.bind("<Home>",  lambda e: self._key(self.scroll_to, 0))
+        self.tree.bind("<End>",   lambda e: self._key(self.scroll_to, len(self)))
+
+    def __len__(self):
+        return len(self._store) if self._store is not None else 0
+
+    def set_store(self, store):
+        """Show a new SalesStore from the top"""
+        self._store = store
+        columns = ["Date"] + store.products
+        self.tree.delete(*self._items)
+        self._items = []
+        self.tree["columns"] = columns
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=110, anchor="center")
+        self.scroll_to(0)
+
+    def scroll_to(self, first):
+        self._first = max(0, min(first, len(self) - self._rows))
+        self._refresh()
+
+    def page(self, pages):
+        self.scroll_to(self._first + pages * self._rows)
+
+    def jump_to_date(self, text):
+        """Scroll to the first row on or after the date in `text` (day
+        first). Raises ValueError if it is not a date."""
+        if self._store is None:
+            return
+        target = pd.to_datetime(text, dayfirst=True)
+        if pd.isna(target):
+            raise ValueError(f"not a date: {text!r}")
+        dates = self._store.dates
+        after = np.flatnonzero(~np.isnat(dates) & (dates >= target.to_datetime64()))
+        self.scroll_to(int(after[0]) if len(after) else len(self))
+
+    def _refresh(self):
+        n     = len(self)
+        first = self._first
+        shown = max(0, min(self._rows + 1, n - first))  # +1: partly visible row
+
+        while len(self._items) < shown:
+            self._items.append(self.tree.insert("", "end"))
+        while len(self._items) > shown:
+            self.tree.delete(self._items.pop())
+
+        if shown:
+            store = self._store
+            rows  = slice(first, first + shown)
+            dates = pd.DatetimeIndex(store.dates[rows]).strftime("%d %b %Y")
+            cols  = [store.values(p)[rows] for p in store.products]
+            for k, iid in enumerate(self._items):
+                date = dates[k] if isinstance(dates[k], str) else ""
+                self.tree.item(iid, values=[date] + [_cell(c[k]) for c in cols])
+
+        if n:
+            last = min(first + self._rows, n)
+            self._vs.set(first / n, last / n)
+            self.status.set(f"Rows {first + 1:,}-{last:,} of {n:,}")
+        else:
+            self._vs.set(0, 1)
+            self.status.set("")
+
+    # Events
+    def _on_resize(self, event):
+        rows = max(1, (event.height - HEADING_HEIGHT) // self.row_height)
+        if rows != self._rows:
+            self._rows = rows
+            self.scroll_to(self._first)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self)))
+        elif unit == "pages":
+            self.page(int(amount))
+        else:
+            self.scroll_to(self._first + int(amount))
+
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self._first - WHEEL_ROWS)
+        else:
+            self.scroll_to(self._first + WHEEL_ROWS)
+        return "break"
+
+    def _key(self, action, arg):
+        action(arg)
+        return "break"
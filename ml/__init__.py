@@ -1 +1,3 @@
- 
+from ml.batch_forecast import forecast_many, score_many, smart_forecast, product_series, ProductForecast
+from ml.sales_store import SalesStore
+from ml.ingest import read_sales, read_tail, read_many, name_products
@@ -1,14 +1,86 @@
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.statespace.sarimax import SARIMAX
 from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error
 import warnings
 warnings.filterwarnings('ignore')
 
+from ml.auto_arima import StepwiseSearch
+from ml.baseline import window_mean
+from ml.model_cache import fit_sarimax
+from ml.parallel import get_executor, run_all
+
+# Simplified grid search for performance
+PARAM_COMBINATIONS = [
+    ((1, 1, 1), (1, 1, 1, 7)),
+    ((0, 1, 1), (1, 1, 0, 7)),
+    ((1, 1, 0), (0, 1, 1, 7)),
+    ((0, 1, 0), (1, 1, 1, 7)),
+    ((1, 0, 1), (1, 0, 1, 7)),
+]
+
+
+def _fit_candidate(sales_series, order, seasonal_order, steps):
+    """Fit one candidate order, returns (aic, forecast). Runs in a worker."""
+    warnings.filterwarnings('ignore')
+    result = fit_sarimax(
+        sales_series,
+        order=order,
+        seasonal_order=seasonal_order,
+        enforce_stationarity=False,
+        enforce_invertibility=False,
+        maxiter=50
+    )
+    return result.aic, result.forecast(steps=steps)
+
+
+def _fit_holdout(train, test):
+    """Fit on train and score on test, returns (mae, mape). Runs in a worker."""
+    warnings.filterwarnings('ignore')
+    result = fit_sarimax(
+        train,
+        order=(1, 1, 1),
+        seasonal_order=(1, 1, 1, 7),
+        maxiter=50
+    )
+    test_forecast = result.forecast(steps=len(test))
+
+    mae = mean_absolute_error(test, test_forecast)
+    mape = mean_absolute_percentage_error(test, test_forecast) * 100
+    return mae, mape
+
+
+def _holdout_split(sales_series):
+    """First 80% (at least 7 days) to fit, the rest to score"""
+    train_size = int(len(sales_series) * 0.8)
+    if train_size < 7:
+        train_size = max(7, len(sales_series) - 7)
+    return sales_series[:train_size], sales_series[train_size:]
+
+
+def holdout_metrics(sales_series):
+    """
+    MAE/MAPE as AdvancedForecaster.sarima_forecast reports them, without
+    its order search: the holdout fit does not depend on the chosen order.
+    """
+    train, test = _holdout_split(sales_series)
+    holdout = (run_all([(_fit_holdout, (train, test))])[0]
+               if len(test) > 0 and len(train) >= 14 else None)
+    mae, mape = holdout if holdout is not None else (0, 0)
+    return {'MAE': round(mae, 2), 'MAPE': round(mape, 2),
+            'Data_Points': len(sales_series)}
+
+
 class AdvancedForecaster:
-    def __init__(self):
+    def __init__(self, parallel=True, search="stepwise", **search_options):
         self.models = {}
         self.metrics = {}
+        # candidate orders are fitted on the shared process pool unless
+        # parallel is False or an executor is passed to sarima_forecast
+        self.parallel = parallel
+        # "stepwise" = auto-ARIMA search (see ml/auto_arima.py),
+        # "grid" = the fixed PARAM_COMBINATIONS
+        self.search = search
+        self.search_options = search_options
         
     def prepare_series(self, df, product_column):
         """Prepare time series data with advanced features"""
@@ -37,7 +109,7 @@ class AdvancedForecaster:
         
         return series_df
     
-    def sarima_forecast(self, series_df, steps=7, product_name=""):
+    def sarima_forecast(self, series_df, steps=7, product_name="", executor=None):
         """Advanced SARIMA forecasting with auto-parameter tuning"""
         try:
             if series_df is None or len(series_df) == 0:
@@ -48,72 +120,35 @@ class AdvancedForecaster:
             if len(sales_series) < 14:  # Need at least 2 weeks
                 return self._simple_forecast_series(sales_series, steps), {}
             
-            # Try different SARIMA parameters
-            best_model = None
-            best_aic = np.inf
-            best_forecast = None
-            
-            # Simplified grid search for performance
-            param_combinations = [
-                ((1, 1, 1), (1, 1, 1, 7)),
-                ((0, 1, 1), (1, 1, 0, 7)),
-                ((1, 1, 0), (0, 1, 1, 7)),
-                ((0, 1, 0), (1, 1, 1, 7)),
-                ((1, 0, 1), (1, 0, 1, 7)),
-            ]
-            
-            for order, seasonal_order in param_combinations:
-                try:
-                    model = SARIMAX(
-                        sales_series,
-                        order=order,
-                        seasonal_order=seasonal_order,
-                        enforce_stationarity=False,
-                        enforce_invertibility=False
-                    )
-                    result = model.fit(disp=False, maxiter=50)
-                    
-                    if result.aic < best_aic:
-                        best_aic = result.aic
-                        best_model = result
-                        best_forecast = result.forecast(steps=steps)
-                except:
-                    continue
-            
-            if best_forecast is None:
-                return self._simple_forecast_series(sales_series, steps), {}
+            if executor is None and self.parallel:
+                executor = get_executor()
             
             # Calculate metrics on last 20% of data
-            train_size = int(len(sales_series) * 0.8)
-            if train_size < 7:
-                train_size = max(7, len(sales_series) - 7)
+            train, test = _holdout_split(sales_series)
             
-            train = sales_series[:train_size]
-            test = sales_series[train_size:]
+            score_holdout = len(test) > 0 and len(train) >= 14
+            
+            if self.search == "grid":
+                best_order, best_aic, best_forecast, holdout = self._grid_search(
+                    sales_series, steps, train, test, score_holdout, executor)
+            else:
+                best_order, best_aic, best_forecast, holdout = self._stepwise_search(
+                    sales_series, steps, train, test, score_holdout, executor)
+            
+            if best_forecast is None:
+                return self._simple_forecast_series(sales_series, steps), {}
             
             mae = 0
             mape = 0
             
-            if len(test) > 0 and len(train) >= 14:
-                try:
-                    # Fit model on train data
-                    model = SARIMAX(
-                        train,
-                        order=(1, 1, 1),
-                        seasonal_order=(1, 1, 1, 7)
-                    )
-                    result = model.fit(disp=False, maxiter=50)
-                    test_forecast = result.forecast(steps=len(test))
-                    
-                    mae = mean_absolute_error(test, test_forecast)
-                    mape = mean_absolute_percentage_error(test, test_forecast) * 100
-                except:
-                    pass
+            if holdout is not None:
+                mae, mape = holdout
             
             self.metrics[product_name] = {
                 'MAE': round(mae, 2),
                 'MAPE': round(mape, 2),
                 'Best_AIC': round(best_aic, 2),
+                'Best_Order': best_order,
                 'Data_Points': len(sales_series),
                 'Last_Value': float(sales_series.iloc[-1]),
                 'Forecast_Mean': float(best_forecast.mean()),
@@ -128,14 +163,61 @@ class AdvancedForecaster:
                 return self._simple_forecast_series(series_df['sales'], steps), {}
             return self._simple_forecast_array(steps), {}
     
+    def _grid_search(self, sales_series, steps, train, test, score_holdout, executor):
+        """Fixed candidate grid, returns (order, aic, forecast, holdout)"""
+        # The holdout fit does not depend on the winning order, so it is
+        # submitted together with the candidates
+        tasks = [(_fit_candidate, (sales_series, order, seasonal_order, steps))
+                 for order, seasonal_order in PARAM_COMBINATIONS]
+        if score_holdout:
+            tasks.append((_fit_holdout, (train, test)))
+        
+        results = run_all(tasks, executor)
+        
+        # Try different SARIMA parameters, in grid order so ties on AIC
+        # resolve the same way as a serial search
+        best_order = None
+        best_aic = np.inf
+        best_forecast = None
+        
+        for params, fitted in zip(PARAM_COMBINATIONS, results):
+            if fitted is None:
+                continue
+            aic, forecast = fitted
+            if aic < best_aic:
+                best_order = params
+                best_aic = aic
+                best_forecast = forecast
+        
+        holdout = results[-1] if score_holdout else None
+        return best_order, best_aic, best_forecast, holdout
+    
+    def _stepwise_search(self, sales_series, steps, train, test, score_holdout, executor):
+        """Stepwise auto-ARIMA, returns (order, aic, forecast, holdout)"""
+        # the holdout fit does not depend on the search either, so it
+        # runs on the pool with the starting models
+        search = StepwiseSearch(**self.search_options)
+        found = search.fit(sales_series, executor=executor,
+                           extra_tasks=[(_fit_holdout, (train, test))] if score_holdout else ())
+        holdout = search.extra_results[0] if score_holdout else None
+        if found is None:
+            return None, np.inf, None, None
+        
+        order, seasonal_order, best_aic = found
+        try:
+            # same options as the search, so this is a cache hit
+            _, forecast = _fit_candidate(sales_series, order, seasonal_order, steps)
+        except Exception:
+            return None, np.inf, None, None
+        return (order, seasonal_order), best_aic, forecast, holdout
+    
     def _simple_forecast_series(self, series, steps):
         """Fallback forecasting method for pandas Series"""
         if len(series) == 0:
             return pd.Series([0] * steps)
         
         # Simple moving average forecast
-        last_week_avg = series[-7:].mean() if len(series) >= 7 else series.mean()
-        return pd.Series([last_week_avg] * steps)
+        return pd.Series(window_mean(series.values, steps, window=7)[0])
     
     def _simple_forecast_array(self, steps):
         """Fallback forecasting method returning array"""
@@ -0,0 +1,178 @@
+import time
+import warnings
+import numpy as np
+
+from ml.model_cache import fit_sarimax
+from ml.parallel import run_all, stage_token
+
+warnings.filterwarnings('ignore')
+
+
+def seasonal_strength(values, m=7):
+    """
+    Wang-Smith-Hyndman seasonal strength from an STL decomposition,
+    0 = no weekly pattern, 1 = purely seasonal
+    """
+    from statsmodels.tsa.seasonal import STL
+
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2 * m + 1:
+        return 0.0
+    res = STL(values, period=m, robust=True).fit()
+    denom = np.var(res.seasonal + res.resid)
+    if denom == 0:
+        return 0.0
+    return float(max(0.0, 1 - np.var(res.resid) / denom))
+
+
+def nsdiffs(values, m=7, threshold=0.64):
+    """Seasonal differences needed (0 or 1), like forecast::nsdiffs"""
+    return 1 if seasonal_strength(values, m) > threshold else 0
+
+
+def ndiffs(values, alpha=0.05, max_d=2):
+    """Non-seasonal differences needed, repeating a KPSS level test"""
+    from statsmodels.tsa.stattools import kpss
+
+    x = np.asarray(values, dtype=float)
+    d = 0
+    while d < max_d and len(x) > 10:
+        if np.ptp(x) == 0:
+            break
+        try:
+            _, pvalue, _, _ = kpss(x, regression="c", nlags="auto")
+        except Exception:
+            break
+        if pvalue >= alpha:
+            break
+        x = np.diff(x)
+        d += 1
+    return d
+
+
+def _fit_aic(series, order, seasonal_order, fit_options):
+    """AIC of one candidate. Runs in a worker."""
+    warnings.filterwarnings('ignore')
+    result = fit_sarimax(series, order, seasonal_order, **fit_options)
+    aic = float(result.aic)
+    return aic if np.isfinite(aic) else None
+
+
+class StepwiseSearch:
+    """
+    Hyndman-Khandakar stepwise search over (p,d,q)(P,D,Q,m).
+
+    d and D are fixed up front by KPSS / seasonal-strength tests, then the
+    search moves from the best starting model to its best neighbour until
+    nothing improves or the fit budget (max_fits / max_seconds) runs out.
+    A step fits up to 12 neighbours, so the default max_fits leaves room
+    for the 4 starts and 3 steps. max_seconds is a hard limit: fits still
+    running at the deadline are abandoned. Every visited order is memoised
+    with its AIC.
+    """
+
+    def __init__(self, m=7, max_p=3, max_q=3, max_P=2, max_Q=2,
+                 max_d=2, max_D=1, max_fits=40, max_seconds=30.0,
+                 **fit_options):
+        self.m = m
+        self.max_p, self.max_q = max_p, max_q
+        self.max_P, self.max_Q = max_P, max_Q
+        self.max_d, self.max_D = max_d, max_D
+        self.max_fits = max_fits
+        self.max_seconds = max_seconds
+        self.fit_options = {
+            "enforce_stationarity": False,
+            "enforce_invertibility": False,
+            "maxiter": 50,
+        }
+        self.fit_options.update(fit_options)
+
+        self.visited = {}   # (order, seasonal_order) -> AIC or None
+        self.best = None
+        self.best_aic = np.inf
+        self.stopped_early = False
+        self.extra_results = []
+
+    def _valid(self, p, q, P, Q):
+        return (0 <= p <= self.max_p and 0 <= q <= self.max_q
+                and 0 <= P <= self.max_P and 0 <= Q <= self.max_Q)
+
+    def _neighbours(self, p, d, q, P, D, Q):
+        moves = [(1, 0, 0, 0), (-1, 0, 0, 0), (0, 1, 0, 0), (0, -1, 0, 0),
+                 (0, 0, 1, 0), (0, 0, -1, 0), (0, 0, 0, 1), (0, 0, 0, -1),
+                 (1, 1, 0, 0), (-1, -1, 0, 0), (0, 0, 1, 1), (0, 0, -1, -1)]
+        out = []
+        for dp, dq, dP, dQ in moves:
+            cand = (p + dp, q + dq, P + dP, Q + dQ)
+            if self._valid(*cand):
+                out.append(cand)
+        return out
+
+    def _key(self, p, d, q, P, D, Q):
+        return (p, d, q), (P, D, Q, self.m)
+
+    def _evaluate(self, series, candidates, executor, deadline, extra_tasks=()):
+        """Fit the unvisited candidates (and extra_tasks) in one batch,
+        within the budget"""
+        todo = [c for c in candidates if c not in self.visited]
+        budget = self.max_fits - len(self.visited)
+        remaining = deadline - time.monotonic()
+        if len(todo) > budget or remaining <= 0:
+            self.stopped_early = True
+            todo = todo[:max(0, budget)] if remaining > 0 else []
+        if not todo and not extra_tasks:
+            return False
+
+        tasks = [(_fit_aic, (series, order, seasonal, self.fit_options))
+                 for order, seasonal in todo]
+        results = run_all(tasks + list(extra_tasks), executor,
+                          stage_token(max(remaining, 0.001)))
+        if extra_tasks:
+            self.extra_results = results[len(todo):]
+        for cand, aic in zip(todo, results):
+            self.visited[cand] = aic
+            if aic is not None and aic < self.best_aic:
+                self.best_aic = aic
+                self.best = cand
+        if time.monotonic() > deadline:
+            self.stopped_early = True
+        return bool(todo)
+
+    def fit(self, series, executor=None, extra_tasks=()):
+        """
+        runs the search, returns (order, seasonal_order, aic) of the best
+        model or None when nothing could be fitted. extra_tasks ((fn, args)
+        independent of the search) are run with the starting models, their
+        results end up in extra_results.
+        """
+        deadline = time.monotonic() + self.max_seconds
+        values = series.values.astype(float)
+
+        D = min(self.max_D, nsdiffs(values, self.m)) if len(values) >= 2 * self.m + 1 else 0
+        seasonal_diffed = values[self.m:] - values[:-self.m] if D else values
+        d = ndiffs(seasonal_diffed, max_d=self.max_d)
+
+        starts = [(2, d, 2, 1, D, 1), (0, d, 0, 0, D, 0),
+                  (1, d, 0, 1, D, 0), (0, d, 1, 0, D, 1)]
+        starts = [s for s in starts if self._valid(s[0], s[2], s[3], s[5])]
+        self._evaluate(series, [self._key(*s) for s in starts], executor, deadline,
+                       extra_tasks)
+
+        while self.best is not None and not self.stopped_early:
+            (p, d, q), (P, D, Q, _) = self.best
+            before = self.best
+            cands = [self._key(np_, d, nq, nP, D, nQ)
+                     for np_, nq, nP, nQ in self._neighbours(p, d, q, P, D, Q)]
+            if not self._evaluate(series, cands, executor, deadline):
+                break
+            if self.best == before:
+                break
+
+        if self.best is None:
+            return None
+        return self.best[0], self.best[1], self.best_aic
+
+
+def auto_sarima(series, executor=None, **search_options):
+    """Shortcut: best (order, seasonal_order, aic) for a series, or None"""
+    return StepwiseSearch(**search_options).fit(series, executor=executor)
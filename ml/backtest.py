@@ -0,0 +1,187 @@
+import math
+import time
+import numpy as np
+import pandas as pd
+
+from ml.batch_forecast import smart_forecast, seasonal_ma, product_series
+from ml.parallel import get_executor, run_all
+
+
+# Built-in forecasters, referenced by name so fold tasks stay picklable.
+# Each takes (train_series, steps) and returns values or (values, method).
+def _smart(train, steps):
+    return smart_forecast(train, steps=steps)
+
+
+def _seasonal_ma(train, steps):
+    return seasonal_ma(train.values.astype(float), steps), "Seasonal MA"
+
+
+def _sarima(train, steps):
+    from ml.forecasting import sarima_forecast
+    return sarima_forecast(train, steps=steps).values, "SARIMA"
+
+
+def _mean(train, steps):
+    return np.full(steps, float(train.mean())), "Mean"
+
+
+FORECASTERS = {
+    "smart": _smart,
+    "seasonal_ma": _seasonal_ma,
+    "sarima": _sarima,
+    "mean": _mean,
+}
+
+
+def rolling_origins(n, initial, horizon, step=1, window="expanding",
+                    window_size=None):
+    """
+    forecast origins for a series of length n as (train_start, origin)
+    pairs; each fold trains on [train_start, origin) and is scored on
+    [origin, origin + horizon).
+    window="sliding" keeps the training length fixed at window_size
+    (defaults to initial), "expanding" always starts at 0.
+    """
+    if window not in ("expanding", "sliding"):
+        raise ValueError(f"window must be 'expanding' or 'sliding', not {window!r}")
+
+    size = window_size or initial
+    folds = []
+    origin = initial
+    while origin + horizon <= n:
+        start = max(0, origin - size) if window == "sliding" else 0
+        folds.append((start, origin))
+        origin += step
+    return folds
+
+
+def _run_folds(series, forecaster, folds, horizon):
+    """Run a chunk of folds for one series. Runs in a worker."""
+    fn = FORECASTERS[forecaster] if isinstance(forecaster, str) else forecaster
+    out = []
+    for start, origin in folds:
+        train = series.iloc[start:origin]
+        actual = series.values[origin:origin + horizon].astype(float)
+        try:
+            pred = fn(train, horizon)
+        except Exception as e:
+            print(f"[Backtest] fold at {origin} failed: {e}")
+            continue
+        method = ""
+        if isinstance(pred, tuple):
+            pred, method = pred
+        pred = np.asarray(pred, dtype=float).flatten()[:horizon]
+        out.append((origin, method, pred, actual))
+    return out
+
+
+class BacktestResult:
+    """Per-horizon-day errors for one product, overall and per forecast tier"""
+
+    def __init__(self, product, horizon, folds, seconds=0.0):
+        self.product = product
+        self.horizon = horizon
+        self.folds = folds          # list of (origin, method, pred, actual)
+        self.seconds = seconds
+
+    @staticmethod
+    def _errors(folds, horizon):
+        if not folds:
+            nan = np.full(horizon, np.nan)
+            return nan, nan
+        pred = np.vstack([f[2] for f in folds])
+        actual = np.vstack([f[3] for f in folds])
+        abs_err = np.abs(pred - actual)
+        mae = abs_err.mean(axis=0)
+        # zero-sales days are left out of MAPE rather than blowing it up
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(actual != 0, abs_err / np.abs(actual), np.nan)
+        mape = np.nanmean(pct, axis=0) * 100 if np.isfinite(pct).any() else \
+            np.full(horizon, np.nan)
+        return mae, mape
+
+    @property
+    def n_folds(self):
+        return len(self.folds)
+
+    def summary(self):
+        """DataFrame with MAE/MAPE per horizon day"""
+        mae, mape = self._errors(self.folds, self.horizon)
+        return pd.DataFrame({
+            "Horizon": np.arange(1, self.horizon + 1),
+            "MAE": mae,
+            "MAPE": mape,
+        })
+
+    def by_method(self):
+        """{method: summary DataFrame with a Folds column}"""
+        out = {}
+        for method in sorted({f[1] for f in self.folds}):
+            folds = [f for f in self.folds if f[1] == method]
+            mae, mape = self._errors(folds, self.horizon)
+            out[method or "forecaster"] = pd.DataFrame({
+                "Horizon": np.arange(1, self.horizon + 1),
+                "MAE": mae,
+                "MAPE": mape,
+                "Folds": len(folds),
+            })
+        return out
+
+    def __repr__(self):
+        return (f"BacktestResult({self.product!r}, folds={self.n_folds}, "
+                f"horizon={self.horizon}, seconds={self.seconds:.1f})")
+
+
+def _chunks(folds, n_chunks):
+    size = max(1, math.ceil(len(folds) / max(1, n_chunks)))
+    return [folds[i:i + size] for i in range(0, len(folds), size)]
+
+
+def backtest_many(df, columns=None, forecaster="smart", horizon=7,
+                  initial=42, step=7, window="expanding", window_size=None,
+                  executor=None, chunks_per_product=None):
+    """
+    Rolling-origin evaluation of every product column.
+
+    All folds of all products go into one task list so the pool stays busy;
+    folds are grouped into chunks to keep inter-process traffic low.
+    `forecaster` is a name from FORECASTERS or a module-level function
+    taking (train_series, steps). Returns {column: BacktestResult}.
+    """
+    if columns is None:
+        columns = [c for c in df.columns if c != "Date"]
+    if executor is None:
+        executor = get_executor()
+    if chunks_per_product is None:
+        workers = getattr(executor, "_max_workers", 1) or 1
+        chunks_per_product = max(1, (workers * 4) // max(1, len(columns)))
+
+    start = time.perf_counter()
+    tasks, owners = [], []
+    for col in columns:
+        series = product_series(df, col)
+        folds = rolling_origins(len(series), initial, horizon, step,
+                                window, window_size)
+        for chunk in _chunks(folds, chunks_per_product):
+            tasks.append((_run_folds, (series, forecaster, chunk, horizon)))
+            owners.append(col)
+
+    per_product = {col: [] for col in columns}
+    for col, chunk_result in zip(owners, run_all(tasks, executor)):
+        if chunk_result:
+            per_product[col].extend(chunk_result)
+
+    seconds = time.perf_counter() - start
+    return {col: BacktestResult(col, horizon, sorted(per_product[col], key=lambda f: f[0]),
+                                seconds)
+            for col in columns}
+
+
+def backtest(series, forecaster="smart", horizon=7, initial=42, step=7,
+             window="expanding", window_size=None, executor=None):
+    """Rolling-origin evaluation of a single Date-indexed series"""
+    name = series.name or "sales"
+    df = pd.DataFrame({"Date": series.index, name: series.values})
+    return backtest_many(df, [name], forecaster, horizon, initial, step,
+                         window, window_size, executor)[name]
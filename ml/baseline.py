@@ -0,0 +1,71 @@
+import numpy as np
+
+WEEK = 7
+
+
+def as_matrix(values):
+    """2-D float array of products × days (a single series becomes one row)"""
+    matrix = np.asarray(values, dtype=float)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    return matrix
+
+
+def batched_slope(matrix):
+    """
+    least-squares slope of every row against 0..n-1, in closed form:
+    sum((x - x̄)(y - ȳ)) / sum((x - x̄)²)
+    """
+    matrix = as_matrix(matrix)
+    n = matrix.shape[1]
+    if n < 2:
+        return np.zeros(matrix.shape[0])
+    x = np.arange(n, dtype=float)
+    x -= x.mean()
+    return (matrix - matrix.mean(axis=1, keepdims=True)) @ x / (x @ x)
+
+
+def seasonal_naive(matrix, steps, season=WEEK):
+    """Repeat the last observed season of every product"""
+    matrix = as_matrix(matrix)
+    season = min(season, matrix.shape[1])
+    idx = matrix.shape[1] - season + np.arange(steps) % season
+    return matrix[:, idx]
+
+
+def window_mean(matrix, steps, window=WEEK):
+    """Flat forecast at the mean of the last `window` days"""
+    matrix = as_matrix(matrix)
+    means = matrix[:, -window:].mean(axis=1)
+    return np.repeat(means[:, None], steps, axis=1)
+
+
+def weighted_seasonal_ma(matrix, steps, weights=(0.35, 0.65), season=WEEK):
+    """
+    weighted average of the last two seasons, repeated over the horizon.
+    With fewer than two seasons of data the whole history is the pattern.
+    """
+    matrix = as_matrix(matrix)
+    if matrix.shape[1] < season:
+        raise ValueError(f"need at least {season} days, got {matrix.shape[1]}")
+
+    if matrix.shape[1] >= season * 2:
+        last2 = matrix[:, -season * 2:]
+        pattern = weights[0] * last2[:, :season] + weights[1] * last2[:, season:]
+    else:
+        pattern = weights[0] * matrix + weights[1] * matrix
+    return pattern[:, np.arange(steps) % season]
+
+
+def trend_adjusted(matrix, steps, weights=(0.35, 0.65), max_slope=2.0,
+                   season=WEEK):
+    """
+    weighted seasonal MA plus the clipped linear trend of the last two
+    seasons, floored at zero; the batched form of the Seasonal MA tier
+    """
+    matrix = as_matrix(matrix)
+    last2 = matrix[:, -season * 2:]
+    slope = np.clip(batched_slope(last2), -max_slope, max_slope)
+    ahead = np.arange(1, steps + 1, dtype=float)
+    forecast = weighted_seasonal_ma(matrix, steps, weights, season) + slope[:, None] * ahead
+    return np.maximum(forecast, 0.0)
@@ -0,0 +1,204 @@
+"""
+Headless batch forecaster, e.g. for cron on the back-office machine:
+
+    python -m ml.batch                       # every CSV in ml/data/raw
+    python -m ml.batch sales/*.csv --train-weeks 8 --method advanced
+
+Forecasts every product of the input files on the shared process pool and
+writes one <file>_<product>_<n>week_forecast.csv per product (e.g.
+coffee_americano_4week_forecast.csv) plus run_manifest.json
+(inputs, options, per-product timings) to ml/outputs/batch, away from the
+notebook's files in ml/outputs/predictions. Files are
+written atomically, so a reader never sees half of one. Imports neither
+tkinter nor matplotlib. Exits with 1 if any product could not be forecast.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime
+
+from ml.batch_forecast import forecast_many
+from ml.ingest import read_many, sources, name_products
+from ml.parallel import CancelToken, FitTimeout, get_executor, shutdown_executor
+
+ML_DIR      = os.path.dirname(os.path.abspath(__file__))
+INPUT_DIR   = os.path.join(ML_DIR, "data", "raw")
+OUTPUT_DIR  = os.path.join(ML_DIR, "outputs", "batch")
+MANIFEST    = "run_manifest.json"
+
+
+def _slug(product):
+    return re.sub(r"[^a-z0-9]+", "_", product.lower()).strip("_") or "product"
+
+
+def _group(path):
+    """'Pink CoffeeSales March - Oct 2025.csv' -> 'coffee', else the
+    slugged file name"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    m = re.match(r"(?:pink\s*)?(.+?)\s*sales\b", stem, re.I)
+    return _slug(m.group(1) if m else stem)
+
+
+def output_name(product, source, steps):
+    """<file>_<product>_<n>week_forecast.csv like the existing
+    coffee_americano_4week_forecast.csv; a file named after its one
+    product gives croissant_4week_forecast.csv"""
+    name = _slug(product)
+    group = _group(source) if source else name
+    if group != name:
+        name = f"{group}_{name}"
+    return f"{name}_{steps // 7}week_forecast.csv"
+
+
+def _json(value):
+    # numpy scalars in the metrics
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def _write_atomic(path, write):
+    """write(f) into a temp file next to `path`, then rename it over `path`"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="") as f:
+            write(f)
+        # mkstemp makes the file 0600; give it the mode open() would
+        os.chmod(tmp, 0o666 & ~_umask())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_prediction(out_dir, result, steps, source=None):
+    """output_name() file with Date, Predicted Number Sold; `source` is
+    the input file the product came from"""
+    path = os.path.join(out_dir, output_name(result.product, source, steps))
+
+    def write(f):
+        f.write("Date,Predicted Number Sold\n")
+        for date, value in zip(result.dates, result.values):
+            f.write(f"{date:%Y-%m-%d},{float(value)!r}\n")
+
+    _write_atomic(path, write)
+    return path
+
+
+def run(inputs, out_dir=OUTPUT_DIR, steps=28, train_weeks=4, method="smart",
+        workers=None, fit_timeout=None, timeout=None):
+    """Forecast every product in `inputs` and write the outputs; returns
+    the manifest dict"""
+    started = time.time()
+    os.makedirs(out_dir, exist_ok=True)
+
+    t = time.perf_counter()
+    store, report = read_many(inputs, rename=name_products)
+    ingest_seconds = time.perf_counter() - t
+    print(f"[Batch] {len(store.products)} products, {len(store)} days "
+          f"from {len(report['files'])} files in {ingest_seconds:.2f}s")
+
+    def progress(col, res, done, total):
+        state = "ok" if res is not None and res.ok else "failed"
+        print(f"[Batch] {done}/{total} {col}: {state}")
+
+    t = time.perf_counter()
+    token = CancelToken(timeout=timeout)
+    try:
+        results = forecast_many(store.frame(), store.products, steps=steps,
+                                train_window=train_weeks * 7 if train_weeks else None,
+                                method=method, executor=get_executor(workers),
+                                token=token, fit_timeout=fit_timeout,
+                                progress=progress)
+    finally:
+        shutdown_executor()
+    forecast_seconds = time.perf_counter() - t
+
+    products = {}
+    for col, res in results.items():
+        entry = {"ok": res.ok, "method": res.method, "seconds": round(res.seconds, 3),
+                 "metrics": res.metrics, "error": res.error, "file": None}
+        if res.ok:
+            entry["file"] = os.path.basename(write_prediction(
+                out_dir, res, steps, report["sources"].get(col)))
+        products[col] = entry
+
+    manifest = {
+        "started":  datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+        "finished": datetime.now().isoformat(timespec="seconds"),
+        "seconds":  round(time.time() - started, 3),
+        "options":  {"steps": steps, "train_weeks": train_weeks, "method": method,
+                     "workers": workers, "fit_timeout": fit_timeout,
+                     "timeout": timeout},
+        "inputs":   [{"path": r["path"], "rows": r["rows"], "bytes": r["bytes"],
+                      "cached": r["cached"], "seconds": round(r["seconds"], 3)}
+                     for r in report["files"]],
+        "timings":  {"ingest": round(ingest_seconds, 3),
+                     "forecast": round(forecast_seconds, 3)},
+        "products": products,
+    }
+    _write_atomic(os.path.join(out_dir, MANIFEST),
+                  lambda f: json.dump(manifest, f, indent=2, default=_json))
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m ml.batch",
+        description="Forecast every product in the input CSVs and write "
+                    "prediction files plus a run manifest.")
+    parser.add_argument("inputs", nargs="*", default=[INPUT_DIR],
+                        help="CSV files, directories or glob patterns "
+                             "(default: ml/data/raw)")
+    parser.add_argument("--out", default=OUTPUT_DIR,
+                        help="output directory (default: ml/outputs/batch)")
+    parser.add_argument("--steps", type=int, default=28,
+                        help="days to forecast (default: 28)")
+    parser.add_argument("--train-weeks", type=int, default=4,
+                        help="training window in weeks, 0 for all history "
+                             "(default: 4, as on the Dashboard)")
+    parser.add_argument("--method", choices=["smart", "advanced"], default="smart")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process pool size (default: CPUs - 1, at most 8)")
+    parser.add_argument("--fit-timeout", type=float, default=None,
+                        help="seconds any single model fit may take")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="seconds for the whole forecast run")
+    args = parser.parse_args(argv)
+
+    # each argument may be a directory or glob; read_many takes one of them
+    # or a list of files, so expand them here
+    paths = [p for spec in args.inputs for p in sources(spec)]
+    if not paths:
+        parser.error(f"no CSV files in {' '.join(args.inputs)}")
+
+    try:
+        manifest = run(paths, args.out, args.steps, args.train_weeks, args.method,
+                       args.workers, args.fit_timeout, args.timeout)
+    except FitTimeout as e:
+        print(f"[Batch] stopped: {e}")
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"[Batch] failed: {e}")
+        return 1
+
+    failed = [p for p, entry in manifest["products"].items() if not entry["ok"]]
+    print(f"[Batch] wrote {len(manifest['products']) - len(failed)} forecasts to "
+          f"{args.out} in {manifest['seconds']:.1f}s"
+          + (f"; failed: {', '.join(failed)}" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
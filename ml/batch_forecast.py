@@ -0,0 +1,311 @@
+import time
+import numpy as np
+import pandas as pd
+
+from ml.baseline import trend_adjusted
+from ml.parallel import FitTimeout, get_executor, run_all
+
+
+def seasonal_ma(series, steps):
+    """Weighted average of the last two weeks plus a clipped linear trend"""
+    return trend_adjusted(series, steps)[0]
+
+
+def smart_forecast(ts_train, steps=28):
+    """
+    Tiered forecast:
+      - 42+ days  → SARIMA (with flat-line fallback detection)
+      - 14-41 days → Seasonal MA
+      - < 14 days  → flat mean
+    """
+    n    = len(ts_train)
+    vals = ts_train.values.astype(float)
+
+    if n >= 42:
+        try:
+            from ml.forecasting import sarima_forecast
+            return _checked_sarima(ts_train, sarima_forecast(ts_train, steps=steps),
+                                   steps)
+        except Exception as e:
+            print(f"[SARIMA failed] {e}")
+
+    if n >= 14:
+        return seasonal_ma(vals, steps), "Seasonal MA"
+
+    return np.full(steps, float(ts_train.mean())), "Mean"
+
+
+def _checked_sarima(ts_train, raw, steps):
+    """Clip a SARIMA forecast to mean +- 3 std; a near-flat one falls
+    back to the Seasonal MA tier"""
+    t_mean   = float(ts_train.mean())
+    t_std    = float(ts_train.std())
+    raw      = raw.clip(lower=max(0, t_mean - 3 * t_std),
+                        upper=t_mean + 3 * t_std)
+    raw_vals = raw.values.astype(float)
+    if raw_vals.std() < t_std * 0.20:
+        return seasonal_ma(ts_train.values.astype(float), steps), "Seasonal MA"
+    return raw_vals, "SARIMA"
+
+
+def smart_models(train_window=None):
+    """
+    IncrementalForecaster for forecast_many(models=...): the smart tier's
+    SARIMA, refitted on the last train_window days
+    """
+    from ml.forecasting import SARIMA_ORDER, SARIMA_SEASONAL, SARIMA_OPTIONS
+    from ml.incremental import IncrementalForecaster
+    return IncrementalForecaster(order=SARIMA_ORDER, seasonal_order=SARIMA_SEASONAL,
+                                 window=train_window, **SARIMA_OPTIONS)
+
+
+class ProductForecast:
+    """Result of forecasting one product column"""
+
+    def __init__(self, product, values=None, dates=None, method="",
+                 metrics=None, seconds=0.0, error=None):
+        self.product = product
+        self.values  = values
+        self.dates   = dates
+        self.method  = method
+        self.metrics = metrics or {}
+        self.seconds = seconds
+        self.error   = error
+
+    @property
+    def ok(self):
+        return self.values is not None
+
+    def __repr__(self):
+        return (f"ProductForecast({self.product!r}, method={self.method!r}, "
+                f"seconds={self.seconds:.2f}, error={self.error!r})")
+
+
+def product_series(df, column):
+    """Date-indexed numeric series for one product, blanks dropped"""
+    ts = pd.to_numeric(df[column], errors="coerce")
+    ts.index = pd.DatetimeIndex(df["Date"])
+    ts = ts[ts.index.notna()].dropna()
+    ts.name = column
+    return ts
+
+
+def _train_window(full_ts, train_window):
+    return (full_ts.tail(train_window)
+            if train_window and len(full_ts) > train_window else full_ts)
+
+
+def _smart_result(column, full_ts, ts_train, values, method, steps):
+    # Hard-cap to exactly `steps` values so weekly slicing
+    # always produces non-overlapping buckets
+    values = np.asarray(values, dtype=float).flatten()[:steps]
+    if len(values) < steps:
+        values = np.pad(values, (0, steps - len(values)),
+                        constant_values=values[-1])
+
+    dates = pd.date_range(start=full_ts.index[-1] + pd.Timedelta(days=1),
+                          periods=steps)
+    metrics = {
+        'Train_Std': float(ts_train.std()),
+        'Data_Points': len(ts_train),
+    }
+    return ProductForecast(column, values, dates, method, metrics)
+
+
+def _forecast_smart(column, full_ts, steps, train_window):
+    """Dashboard tiers on the last train_window days. Runs in a worker."""
+    if len(full_ts) < 14:
+        return ProductForecast(column, error="fewer than 14 days of data")
+
+    ts_train = _train_window(full_ts, train_window)
+    values, method = smart_forecast(ts_train, steps=steps)
+    return _smart_result(column, full_ts, ts_train, values, method, steps)
+
+
+def _forecast_incremental(column, models, full_ts, steps, train_window):
+    """SARIMA tier from the product's existing model, extended by the days
+    added since it was fitted. Runs on the calling thread."""
+    models.catch_up(column, full_ts)
+    ts_train = _train_window(full_ts, train_window)
+    values, method = _checked_sarima(ts_train, models.forecast(column, steps), steps)
+    return _smart_result(column, full_ts, ts_train, values, method, steps)
+
+
+def _forecast_seasonal_batch(series_by_col, steps):
+    """
+    Seasonal MA tier for many products in one NumPy pass; the tier only
+    looks at the last two weeks, so every product stacks into one matrix
+    """
+    start = time.perf_counter()
+    cols = list(series_by_col)
+    matrix = np.vstack([series_by_col[c][1].values[-14:].astype(float)
+                        for c in cols])
+    forecasts = trend_adjusted(matrix, steps)
+    seconds = (time.perf_counter() - start) / len(cols)
+
+    results = {}
+    for col, values in zip(cols, forecasts):
+        full_ts, ts_train = series_by_col[col]
+        res = _smart_result(col, full_ts, ts_train, values, "Seasonal MA", steps)
+        res.seconds = seconds
+        results[col] = res
+    return results
+
+
+def _forecast_advanced(column, frame, steps, train_window):
+    """AdvancedForecaster grid search with MAE/MAPE. Runs in a worker."""
+    from ml.advanced_forecasting import AdvancedForecaster
+
+    forecaster = AdvancedForecaster()
+    series_df = forecaster.prepare_series(frame, column)
+    if series_df is None:
+        return ProductForecast(column, error="no usable rows")
+    if train_window and len(series_df) > train_window:
+        series_df = series_df.tail(train_window)
+
+    forecast, metrics = forecaster.sarima_forecast(series_df, steps=steps,
+                                                   product_name=column)
+    values = np.asarray(forecast, dtype=float)
+    dates = pd.date_range(start=series_df.index[-1] + pd.Timedelta(days=1),
+                          periods=steps)
+    method = "SARIMA" if metrics else "Moving average"
+    return ProductForecast(column, values, dates, method, metrics)
+
+
+def _score_holdout(column, frame):
+    """Holdout MAE/MAPE of the advanced method alone. Runs in a worker."""
+    from ml.advanced_forecasting import AdvancedForecaster, holdout_metrics
+
+    series_df = AdvancedForecaster().prepare_series(frame, column)
+    if series_df is None:
+        return None
+    return holdout_metrics(series_df["sales"])
+
+
+def _timed(fn, column, *args):
+    # timeouts and cancellation are not the product's fault: run_all
+    # turns them into None (or raises Cancelled) instead of an error result
+    start = time.perf_counter()
+    try:
+        result = fn(column, *args)
+    except FitTimeout:
+        raise
+    except Exception as e:
+        result = ProductForecast(column, error=str(e))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def forecast_many(df, columns=None, steps=28, train_window=None,
+                  method="smart", executor=None, token=None, fit_timeout=None,
+                  progress=None, models=None):
+    """
+    Forecast several product columns of a sales frame at once.
+
+    Products are fanned out across the shared process pool (or `executor`)
+    and the results come back as {column: ProductForecast} in column order.
+    method="smart" uses the Dashboard tiers, method="advanced" the
+    AdvancedForecaster search with MAE/MAPE metrics.
+
+    fit_timeout caps every SARIMAX fit and `token` (ml.parallel.CancelToken)
+    carries the request deadline; smart products whose fit timed out drop
+    to the Seasonal MA tier. Cancelling the token raises Cancelled.
+    progress(column, result, done, total) is called as products finish;
+    it runs on the calling thread.
+
+    models (from smart_models(train_window)) keeps the smart tier's SARIMA
+    fits between calls: a product fitted before is extended by its new days
+    with one Kalman filter pass on the calling thread instead of refitted,
+    falling back to a full fit if its new days do not follow on.
+    """
+    if columns is None:
+        columns = [c for c in df.columns if c != "Date"]
+
+    tasks, task_cols, batched, series, extended = [], [], {}, {}, {}
+    for col in columns:
+        if method == "advanced":
+            tasks.append((_timed, (_forecast_advanced, col,
+                                   df[["Date", col]], steps, train_window)))
+            task_cols.append(col)
+            continue
+
+        full_ts  = product_series(df, col)
+        ts_train = _train_window(full_ts, train_window)
+        series[col] = (full_ts, ts_train)
+        if 14 <= len(ts_train) < 42:
+            batched[col] = series[col]
+        elif models is not None and col in models and len(ts_train) >= 42:
+            extended[col] = series[col][0]
+        else:
+            tasks.append((_timed, (_forecast_smart, col,
+                                   full_ts, steps, train_window)))
+            task_cols.append(col)
+
+    done = []
+
+    def _report(col, res):
+        done.append(col)
+        if progress is not None:
+            progress(col, res, len(done), len(columns))
+
+    incremental = {}
+    for col, full_ts in extended.items():
+        res = run_all([(_timed, (_forecast_incremental, col, models, full_ts,
+                                 steps, train_window))], None, token, fit_timeout)[0]
+        if res is not None and res.ok:
+            incremental[col] = res
+            _report(col, res)
+        else:
+            if res is not None:
+                models.forget(col)  # new days do not fit it; a timeout keeps it
+            tasks.append((_timed, (_forecast_smart, col,
+                                   full_ts, steps, train_window)))
+            task_cols.append(col)
+
+    if executor is None and len(tasks) > 1:
+        executor = get_executor()
+
+    def _on_result(i, res):
+        # timed-out smart products are reported with the fallback below
+        if res is not None or task_cols[i] not in series:
+            _report(task_cols[i], res)
+
+    results = dict(zip(task_cols, run_all(tasks, executor, token, fit_timeout,
+                                          _on_result)))
+    results.update(incremental)
+
+    if models is not None:
+        # the fit is in the model cache now, so the model costs one filter pass
+        for col in task_cols:
+            if col in series and results[col] is not None \
+                    and results[col].method == "SARIMA":
+                models.remember(col, series[col][1])
+
+    # fits that ran out of time fall back to the Seasonal MA tier
+    for col in task_cols:
+        if results[col] is None and col in series:
+            if len(series[col][1]) >= 14:
+                batched[col] = series[col]
+            else:
+                _report(col, None)
+    if batched:
+        fallback = _forecast_seasonal_batch(batched, steps)
+        results.update(fallback)
+        for col, res in fallback.items():
+            _report(col, res)
+
+    return {col: results[col] if results[col] is not None
+            else ProductForecast(col, error="timed out or worker failed")
+            for col in columns}
+
+
+def score_many(df, columns, executor=None, token=None, fit_timeout=None):
+    """
+    MAE/MAPE/Data_Points as method="advanced" reports them, for products
+    that already have a forecast (e.g. the Dashboard's): only the holdout
+    fit runs, not the order search. Returns {column: metrics or None}.
+    """
+    tasks = [(_score_holdout, (col, df[["Date", col]])) for col in columns]
+    if executor is None and len(tasks) > 1:
+        executor = get_executor()
+    return dict(zip(columns, run_all(tasks, executor, token, fit_timeout)))
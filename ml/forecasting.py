@@ -1,5 +1,11 @@
 import pandas as pd
-from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+from ml.model_cache import fit_sarimax
+
+# the Dashboard's SARIMA, shared with the incremental models built for it
+SARIMA_ORDER    = (1, 1, 1)
+SARIMA_SEASONAL = (1, 1, 1, 7)
+SARIMA_OPTIONS  = dict(enforce_stationarity=False, enforce_invertibility=False)
 
 '''
 def load_and_prepare_series(csv_path, product_column):
@@ -30,15 +36,12 @@ def sarima_forecast(series, steps=7):
     trains a SARIMA model and returns a forecast series
     """
 
-    model = SARIMAX(
+    result = fit_sarimax(
         series,
-        order=(1, 1, 1),
-        seasonal_order=(1, 1, 1, 7),
-        enforce_stationarity=False,
-        enforce_invertibility=False
+        order=SARIMA_ORDER,
+        seasonal_order=SARIMA_SEASONAL,
+        **SARIMA_OPTIONS
     )
-
-    result = model.fit(disp=False)
     forecast = result.forecast(steps=steps)
 
     return forecast
@@ -0,0 +1,156 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+from ml.model_cache import fit_sarimax
+
+warnings.filterwarnings('ignore')
+
+DAY = pd.Timedelta(days=1)
+
+
+def _check_follows(known, new):
+    """new daily observations must start the day after `known` ends, without gaps"""
+    if len(known) and new[0] != known[-1] + DAY:
+        raise ValueError(
+            f"New observations start at {new[0]:%d %b %Y}, "
+            f"the next expected day is {known[-1] + DAY:%d %b %Y}")
+    gaps = np.flatnonzero(new[1:] - new[:-1] != DAY)
+    if len(gaps):
+        raise ValueError(
+            f"New observations skip from {new[gaps[0]]:%d %b %Y} "
+            f"to {new[gaps[0] + 1]:%d %b %Y}")
+
+
+class IncrementalModel:
+    """
+    Fitted SARIMAX state for one product that can be extended day by day.
+
+    New observations are pushed through the Kalman filter with the existing
+    parameters (one filter pass). A full refit only happens every
+    `refit_every` appended days, or earlier when the one-step-ahead errors
+    of the appended days drift away from zero. With `window` set, a refit
+    only sees the last `window` days, like the Dashboard's training window.
+    """
+
+    def __init__(self, series, order=(1, 1, 1), seasonal_order=(1, 1, 1, 7),
+                 refit_every=28, drift_threshold=3.0, window=None, **fit_options):
+        self.order = order
+        self.seasonal_order = seasonal_order
+        self.refit_every = refit_every
+        self.drift_threshold = drift_threshold
+        self.window = window
+        self.fit_options = fit_options
+
+        self.series = series.astype(float)
+        self.result = None
+        self.appended_since_fit = 0
+        self.refits = 0
+        self._errors = []
+        self.refit()
+
+    def refit(self):
+        """Full optimisation on everything seen so far (the last `window` days)"""
+        if self.window and len(self.series) > self.window:
+            self.series = self.series.iloc[-self.window:]
+        self.result = fit_sarimax(self.series, self.order, self.seasonal_order,
+                                  **self.fit_options)
+        self.appended_since_fit = 0
+        self.refits += 1
+        self._errors = []
+
+    def drift_score(self):
+        """|mean standardised error| * sqrt(n) over days appended since the last fit"""
+        if not self._errors:
+            return 0.0
+        errs = np.asarray(self._errors, dtype=float)
+        return float(abs(errs.mean()) * np.sqrt(len(errs)))
+
+    def update(self, new_obs):
+        """
+        appends new observations, returns True when that triggered a refit.
+        They must continue the daily series: starting the day after the last
+        known day, with no blank or missing days.
+        """
+        new_obs = new_obs.dropna().astype(float)
+        if len(new_obs) == 0:
+            return False
+
+        _check_follows(self.series.index, new_obs.index)
+
+        self.series = pd.concat([self.series, new_obs])
+        self.result = self.result.append(new_obs, refit=False)
+        self.appended_since_fit += len(new_obs)
+
+        errs = self.result.filter_results.standardized_forecasts_error[0][-len(new_obs):]
+        self._errors.extend(e for e in errs if np.isfinite(e))
+
+        if (self.appended_since_fit >= self.refit_every
+                or self.drift_score() > self.drift_threshold):
+            self.refit()
+            return True
+        return False
+
+    def forecast(self, steps=7):
+        return self.result.forecast(steps=steps)
+
+
+class IncrementalForecaster:
+    """
+    Keeps one IncrementalModel per product column. remember() only stores
+    the training series of a fit that is already in the model cache; the
+    model is built from it (one filter pass) the first time it is needed.
+    """
+
+    def __init__(self, **model_options):
+        self.model_options = model_options
+        self.models = {}
+        self.pending = {}
+
+    def __contains__(self, product):
+        return product in self.models or product in self.pending
+
+    def fit(self, product, series):
+        self.pending.pop(product, None)
+        self.models[product] = IncrementalModel(series, **self.model_options)
+        return self.models[product]
+
+    def remember(self, product, series):
+        self.models.pop(product, None)
+        self.pending[product] = series
+
+    def forget(self, product):
+        self.models.pop(product, None)
+        self.pending.pop(product, None)
+
+    def model(self, product):
+        if product not in self.models:
+            if product not in self.pending:
+                raise ValueError(f"No model for {product}, fit it on its history first")
+            self.fit(product, self.pending[product])
+        return self.models[product]
+
+    def update(self, product, new_obs):
+        """Extend a product's model; unseen products are refused"""
+        return self.model(product).update(new_obs)
+
+    def catch_up(self, product, series):
+        """Appends the days of `series` after the model's last day, returns
+        True when that triggered a refit"""
+        model = self.model(product)
+        return model.update(series[series.index > model.series.index[-1]])
+
+    def update_frame(self, df):
+        """
+        appends every product column of a Date-indexed frame of new days,
+        returns {product: refitted}
+        """
+        refitted = {}
+        for col in df.columns:
+            obs = pd.to_numeric(df[col], errors="coerce").dropna()
+            if len(obs):
+                refitted[col] = self.update(col, obs)
+        return refitted
+
+    def forecast(self, product, steps=7):
+        return self.model(product).forecast(steps)
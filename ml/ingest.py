@@ -0,0 +1,451 @@
+import io
+import os
+import csv
+import glob
+import time
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from ml.sales_store import SalesStore
+
+CHUNK_ROWS = 100_000   # rows parsed per read_csv chunk
+SNIFF_ROWS = 200       # data rows sampled to pick the date format
+CACHE_DIR  = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "outputs", "ingest_cache")
+CACHE_FORMAT = 2       # bump when parsing changes so old entries are ignored
+MAX_READERS  = 4       # files parsed at once by read_many
+
+# exports whose only product column has a generic name
+SINGLE_PRODUCT_NAMES = {"Number Sold": "Croissant"}
+
+# tried in order, so ambiguous dates like 01/03/2025 stay day-first
+DATE_FORMATS = ["%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y", "%d.%m.%Y", "%Y-%m-%d",
+                "%Y/%m/%d", "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S",
+                "%Y-%m-%d %H:%M:%S", "%m/%d/%Y", "%d %b %Y", "%d-%b-%Y"]
+
+
+class DateFormatError(ValueError):
+    """A date past the sniffed rows does not parse with their format"""
+
+
+class CsvLayout:
+    """What sniff() found out about a sales CSV"""
+
+    def __init__(self, columns, header_rows, date_format):
+        self.columns     = columns       # cleaned names, "Date" included
+        self.header_rows = header_rows   # 1, or 2 for the Coffee export
+        self.date_format = date_format   # None: let pandas infer (day first)
+
+
+def _date_format(samples):
+    samples = [s for s in samples if s]
+    if not samples:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            pd.to_datetime(samples, format=fmt)
+            return fmt
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+def sniff(path):
+    """
+    Read just the top of the file: the header layout (a second header row
+    when the first has blank cells, as in 'Date,Number Sold,' over
+    ',Cappuccino,Americano') and a fixed date format that parses every
+    sampled date.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        first  = [c.strip() for c in next(reader, [])]
+        if any(c == "" for c in first):
+            second  = [c.strip() for c in next(reader, [])]
+            second += [""] * (len(first) - len(second))
+            columns = [b or a for a, b in zip(first, second)]
+            header_rows = 2
+        else:
+            columns, header_rows = first, 1
+
+        if "Date" not in columns:
+            raise ValueError(f"no Date column in {path}")
+        d = columns.index("Date")
+        samples = []
+        for row in reader:
+            if len(samples) >= SNIFF_ROWS:
+                break
+            if len(row) > d:
+                samples.append(row[d].strip())
+
+    return CsvLayout(columns, header_rows, _date_format(samples))
+
+
+def _parse_dates(values, date_format):
+    if date_format is None:
+        return pd.to_datetime(values, dayfirst=True, errors="coerce")
+    return pd.to_datetime(values, format=date_format, errors="coerce")
+
+
+def _chunks(source, layout, chunk_rows, numeric, skiprows):
+    products = [c for c in layout.columns if c != "Date"]
+    dtype = {"Date": str}
+    dtype.update({c: ("float64" if numeric else str) for c in products})
+    return pd.read_csv(source, header=None, names=layout.columns,
+                       skiprows=skiprows, dtype=dtype,
+                       skipinitialspace=True, encoding="utf-8-sig",
+                       chunksize=chunk_rows)
+
+
+class _Hashing(io.RawIOBase):
+    """Binary reader that feeds every byte read through it to SHA-256"""
+
+    def __init__(self, f):
+        self._f = f
+        self.sha = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = self._f.readinto(b)
+        self.sha.update(memoryview(b)[:n])
+        return n
+
+
+def _read(path, layout, chunk_rows, progress, offset=0):
+    """Parse the rows of `path` from byte `offset` (0: after the header)
+    into a SalesStore; returns (store, rows, digest), digest being the
+    SHA-256 of the bytes from `offset` on, hashed while parsing"""
+    products = [c for c in layout.columns if c != "Date"]
+
+    with open(path, "rb") as f:
+        for numeric in (True, False):
+            dates, values, rows = [], {c: [] for c in products}, 0
+            f.seek(offset)
+            hashing = _Hashing(f)
+            source  = io.BufferedReader(hashing, 1 << 20)
+            skiprows = layout.header_rows if offset == 0 else 0
+            try:
+                for chunk in _chunks(source, layout, chunk_rows, numeric, skiprows):
+                    raw    = chunk["Date"].str.strip()
+                    parsed = _parse_dates(raw, layout.date_format)
+                    # the format came from the first rows; unlike blank
+                    # dates, one that does not parse must not vanish
+                    bad = parsed.isna() & raw.fillna("").ne("")
+                    if bad.any():
+                        raise DateFormatError(
+                            f"{path}: {int(bad.sum())} date(s) such as "
+                            f"{raw[bad].iloc[0]!r} do not match the format of "
+                            f"the first rows ({layout.date_format or 'day first'})")
+                    dates.append(parsed.to_numpy())
+                    for c in products:
+                        col = chunk[c] if numeric else pd.to_numeric(chunk[c], errors="coerce")
+                        values[c].append(col.to_numpy(dtype=float))
+                    rows += len(chunk)
+                    if progress is not None:
+                        progress(rows)
+                while source.read(1 << 20):
+                    pass  # the parser may stop short of the last bytes
+                break
+            except DateFormatError:
+                raise
+            except ValueError:
+                if not numeric:
+                    raise
+                print(f"[Ingest] {path}: non-numeric sales cells, re-reading as text")
+
+    store = SalesStore(np.concatenate(dates) if dates else np.array([], "datetime64[ns]"),
+                       {c: np.concatenate(v) if v else np.array([]) for c, v in values.items()})
+    return store, rows, hashing.sha.hexdigest()
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class SalesCache:
+    """
+    Parsed sales files as uncompressed .npz (dates + one float array per
+    product), one entry per source path.
+
+    An entry is used when the file still has the same size and either the
+    same mtime or, if it was touched, the same SHA-256 of its contents.
+    File mtimes of the entries double as the LRU clock, as in ModelCache.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_entries=50):
+        self.cache_dir   = cache_dir
+        self.max_entries = max_entries
+
+    def _path(self, source):
+        key = hashlib.sha256(f"{CACHE_FORMAT}:{os.path.abspath(source)}".encode())
+        return os.path.join(self.cache_dir, key.hexdigest() + ".npz")
+
+    def load(self, source):
+        """Returns (store, meta) for an up-to-date entry, else None"""
+        path = self._path(source)
+        try:
+            st = os.stat(source)
+            with np.load(path) as f:
+                if (str(f["source"]) != os.path.abspath(source)
+                        or int(f["size"]) != st.st_size):
+                    return None
+                if int(f["mtime_ns"]) != st.st_mtime_ns:
+                    if str(f["digest"]) != file_digest(source):
+                        return None
+                    touched = True
+                else:
+                    touched = False
+                products = [str(p) for p in f["products"]]
+                store = SalesStore(f["dates"], {p: f[f"v{i}"]
+                                                for i, p in enumerate(products)})
+                meta  = {"header_rows": int(f["header_rows"]),
+                         "date_format": str(f["date_format"]) or None,
+                         "digest":      str(f["digest"])}
+        except (OSError, KeyError, ValueError):
+            return None
+        if touched:
+            self.store(source, store, meta)  # same contents, new mtime
+        else:
+            os.utime(path)  # mark as recently used
+        return store, meta
+
+    def store(self, source, sales, meta, stat=None):
+        """Write atomically; `meta` needs header_rows and date_format and
+        may carry the digest if it is already known. `stat` is the source's
+        os.stat from before it was parsed: nothing is stored if the file
+        has changed since."""
+        try:
+            st = os.stat(source)
+            if stat is not None and (stat.st_size, stat.st_mtime_ns) != (
+                    st.st_size, st.st_mtime_ns):
+                return
+            digest = meta.get("digest") or file_digest(source)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f,
+                         source=os.path.abspath(source), size=st.st_size,
+                         mtime_ns=st.st_mtime_ns, digest=digest,
+                         header_rows=meta["header_rows"],
+                         date_format=meta["date_format"] or "",
+                         products=np.array(sales.products, dtype=str),
+                         dates=sales.dates,
+                         **{f"v{i}": sales.values(p)
+                            for i, p in enumerate(sales.products)})
+            os.replace(tmp, self._path(source))
+            self._evict()
+        except OSError as e:
+            print(f"[SalesCache] store failed: {e}")
+
+    def clear(self):
+        for name, _ in self._entries():
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def _entries(self):
+        entries = []
+        try:
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".npz"):
+                    entries.append((entry.name, entry.stat().st_mtime))
+        except OSError:
+            pass
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        while len(entries) > self.max_entries:
+            name, _ = entries.pop(0)
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+
+_default_cache = None
+
+
+def get_cache():
+    global _default_cache
+
+    if _default_cache is None:
+        _default_cache = SalesCache()
+    return _default_cache
+
+
+def read_sales(path, chunk_rows=CHUNK_ROWS, progress=None, cache=None):
+    """
+    Parse a sales CSV in one pass into a SalesStore, or read it from the
+    SalesCache when the file has not changed (pass cache=False to always
+    parse).
+
+    The file is read in chunks of `chunk_rows` with explicit dtypes (dates
+    as strings parsed with the sniffed format, products as float64; a
+    product cell that is not a number makes the read fall back to strings
+    coerced with to_numeric). `progress(rows_so_far)` is called after each
+    chunk. Returns (store, report), report being a dict with rows,
+    seconds, rows_per_sec, header_rows, date_format, cached and bytes (the
+    file size that was read, for a later read_tail).
+    """
+    start = time.perf_counter()
+    if cache is None:
+        cache = get_cache()
+    if cache:
+        hit = cache.load(path)
+        if hit is not None:
+            store, meta = hit
+            return store, _report(path, len(store), start, meta["header_rows"],
+                                  meta["date_format"], os.stat(path).st_size,
+                                  cached=True)
+
+    stat   = os.stat(path)
+    layout = sniff(path)
+    store, rows, digest = _read(path, layout, chunk_rows, progress)
+
+    report = _report(path, rows, start, layout.header_rows, layout.date_format,
+                     stat.st_size, cached=False)
+    if cache:
+        # hashed while parsing, so storing does not read the file again
+        cache.store(path, store, dict(report, digest=digest), stat)
+    return store, report
+
+
+def read_tail(path, offset, chunk_rows=CHUNK_ROWS, progress=None):
+    """
+    Only the rows added to a growing CSV since an earlier read that stopped
+    at byte `offset` (report["bytes"] of that read), as (store, report).
+    Raises ValueError when the file is not that earlier file plus new
+    lines (it shrank, or the row that was last has been extended). A last
+    row without a line break is fine once the new rows start on a new line.
+    """
+    start = time.perf_counter()
+    size  = os.path.getsize(path)
+    if size < offset:
+        raise ValueError(f"{path} is smaller than when it was loaded")
+    if offset > 0:
+        with open(path, "rb") as f:
+            f.seek(offset - 1)
+            before, after = f.read(1), f.read(1)
+        # the blank line left when `after` ends the old last row is skipped
+        if before not in (b"\n", b"\r") and after not in (b"", b"\n", b"\r"):
+            raise ValueError(f"{path} has changed since it was loaded")
+
+    layout = sniff(path)
+    if size == offset:
+        store, rows = SalesStore(np.array([], "datetime64[ns]"),
+                                 {c: np.array([]) for c in layout.columns
+                                  if c != "Date"}), 0
+    else:
+        store, rows, _ = _read(path, layout, chunk_rows, progress, offset)
+    return store, _report(path, rows, start, layout.header_rows,
+                          layout.date_format, size, cached=False)
+
+
+def name_products(store):
+    """The Croissant export's only column is the generic 'Number Sold';
+    name it after the product (SINGLE_PRODUCT_NAMES)"""
+    if len(store.products) == 1 and store.products[0] in SINGLE_PRODUCT_NAMES:
+        name = SINGLE_PRODUCT_NAMES[store.products[0]]
+        return SalesStore(store.dates, {name: store.values(store.products[0])})
+    return store
+
+
+def sources(spec):
+    """CSV paths for a directory, a glob pattern or a list of paths"""
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    if os.path.isdir(spec):
+        return sorted(glob.glob(os.path.join(spec, "*.csv")))
+    if glob.has_magic(spec):
+        return sorted(glob.glob(spec))
+    return [spec]
+
+
+def _daily(store):
+    """The store's products summed per calendar day (rows without a date
+    dropped) as (days, {product: values})"""
+    days = store.dates.astype("datetime64[D]")
+    keep = ~np.isnat(days)
+    frame = pd.DataFrame({p: store.values(p)[keep] for p in store.products},
+                         index=days[keep])
+    frame = frame.groupby(level=0).sum(min_count=1)
+    return frame.index.to_numpy(dtype="datetime64[D]"), {
+        p: frame[p].to_numpy(dtype=float) for p in frame.columns}
+
+
+def read_many(spec, rename=None, max_workers=MAX_READERS, cache=None):
+    """
+    Read several sales files (a directory, glob or list, see sources()) in
+    parallel and merge them into one wide SalesStore on a daily index: the
+    union of every file's days, with each file's rows summed per day and
+    blanks where a file has no row for a day. `rename(store)` (e.g.
+    name_products) may rename a file's products before the merge. A product
+    found in more than one file is combined; a day with a value in both
+    keeps the first file's and is reported. Returns (store, report) with a
+    per-file list of read_sales reports under "files" and the first file
+    each product was found in under "sources".
+    """
+    start = time.perf_counter()
+    paths = sources(spec)
+    if not paths:
+        raise ValueError(f"no CSV files in {spec}")
+
+    # threads: the C parser and file reads release the GIL
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        read = list(pool.map(lambda p: read_sales(p, cache=cache), paths))
+
+    parts = []
+    for path, (store, _) in zip(paths, read):
+        if rename is not None:
+            store = rename(store)
+        parts.append(_daily(store))
+
+    days = np.unique(np.concatenate([d for d, _ in parts]))
+    columns, found_in = {}, {}
+    for path, (file_days, values) in zip(paths, parts):
+        at = np.searchsorted(days, file_days)
+        for product, v in values.items():
+            found_in.setdefault(product, path)
+            col = columns.setdefault(product, np.full(len(days), np.nan))
+            clash = ~np.isnan(col[at]) & ~np.isnan(v)
+            if clash.any():
+                print(f"[Ingest] {product}: {int(clash.sum())} days also in an "
+                      f"earlier file, keeping those values ({os.path.basename(path)})")
+            col[at] = np.where(np.isnan(col[at]), v, col[at])
+
+    store = SalesStore(days.astype("datetime64[ns]"), columns)
+    rows = sum(r["rows"] for _, r in read)
+    formats = sorted({r["date_format"] or "inferred" for _, r in read})
+    report = _report(", ".join(os.path.basename(p) for p in paths), rows, start,
+                     None, " / ".join(formats), sum(r["bytes"] for _, r in read),
+                     cached=all(r["cached"] for _, r in read))
+    report["files"] = [r for _, r in read]
+    report["sources"] = found_in
+    return store, report
+
+
+def _report(path, rows, start, header_rows, date_format, size, cached):
+    seconds = time.perf_counter() - start
+    report  = {"path":         path,
+               "rows":         rows,
+               "seconds":      seconds,
+               "rows_per_sec": rows / seconds if seconds > 0 else float("inf"),
+               "header_rows":  header_rows,
+               "date_format":  date_format,
+               "cached":       cached,
+               "bytes":        size}
+    print(f"[Ingest] {rows} rows in {seconds:.2f}s "
+          f"({report['rows_per_sec']:,.0f} rows/s, "
+          f"{'cache' if cached else 'dates ' + (date_format or 'inferred')})")
+    return report
@@ -0,0 +1,149 @@
+import os
+import time
+import hashlib
+import tempfile
+import numpy as np
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+from ml.parallel import FitTimeout, check_limits, fit_deadline
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "outputs", "model_cache")
+
+
+class ModelCache:
+    """
+    On-disk store of fitted SARIMAX parameters.
+
+    Entries are keyed by a hash of the training series plus the model and
+    fit options, so a hit only needs one Kalman filter pass instead of a
+    full optimisation. File mtimes double as the LRU clock.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_entries=500, max_bytes=20 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def key(self, series, order, seasonal_order, **options):
+        """Content hash of the series values, dates and every model option"""
+        h = hashlib.sha256()
+        h.update(np.ascontiguousarray(series.values, dtype=float).tobytes())
+        if hasattr(series.index, "asi8") and series.index.asi8 is not None:
+            h.update(np.ascontiguousarray(series.index.asi8).tobytes())
+        h.update(repr((tuple(order), tuple(seasonal_order),
+                       sorted(options.items()))).encode())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def load(self, key):
+        """Returns the cached parameter array or None"""
+        path = self._path(key)
+        try:
+            with np.load(path) as f:
+                params = f["params"]
+            os.utime(path)  # mark as recently used
+            return params
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def store(self, key, params):
+        """Write atomically so concurrent workers never see half a file"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, params=np.asarray(params, dtype=float))
+            os.replace(tmp, self._path(key))
+            self._evict()
+        except OSError as e:
+            print(f"[ModelCache] store failed: {e}")
+
+    def clear(self):
+        for name, _, _ in self._entries():
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def _entries(self):
+        entries = []
+        try:
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".npz"):
+                    st = entry.stat()
+                    entries.append((entry.name, st.st_mtime, st.st_size))
+        except OSError:
+            pass
+        return entries
+
+    def _evict(self):
+        """Drop least recently used entries until under both caps"""
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(e[2] for e in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            name, _, size = entries.pop(0)
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
+
+
+_default_cache = None
+
+
+def get_cache():
+    global _default_cache
+
+    if _default_cache is None:
+        _default_cache = ModelCache()
+    return _default_cache
+
+
+def fit_sarimax(series, order, seasonal_order, cache=None,
+                enforce_stationarity=True, enforce_invertibility=True,
+                **fit_kwargs):
+    """
+    SARIMAX(...).fit() that reuses cached parameters when the same series
+    has been fitted with the same options before. Pass cache=False to
+    always refit. Raises FitTimeout when the optimiser runs past the
+    deadline set by ml.parallel.run_all.
+    """
+    if cache is None:
+        cache = get_cache()
+
+    model = SARIMAX(
+        series,
+        order=order,
+        seasonal_order=seasonal_order,
+        enforce_stationarity=enforce_stationarity,
+        enforce_invertibility=enforce_invertibility
+    )
+
+    key = None
+    if cache:
+        key = cache.key(series, order, seasonal_order,
+                        enforce_stationarity=enforce_stationarity,
+                        enforce_invertibility=enforce_invertibility,
+                        **fit_kwargs)
+        params = cache.load(key)
+        if params is not None and len(params) == len(model.param_names):
+            return model.filter(params)
+
+    check_limits()
+    deadline = fit_deadline()
+
+    def _check_deadline(params):
+        check_limits()
+        if deadline is not None and time.time() > deadline:
+            raise FitTimeout(f"SARIMAX{tuple(order)}{tuple(seasonal_order)} fit timed out")
+
+    fit_kwargs = dict(fit_kwargs, callback=_check_deadline)
+
+    result = model.fit(disp=False, **fit_kwargs)
+    if key is not None:
+        cache.store(key, result.params)
+    return result
@@ -0,0 +1,272 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+_executor = None
+
+# how long a worker may overrun its own deadline before the pool is killed
+KILL_GRACE = 3.0
+
+# futures some run_all call is still waiting for; the pool is only killed
+# for abandoned work when none of these would go down with it
+_inflight = set()
+_inflight_lock = threading.Lock()
+
+
+class FitTimeout(RuntimeError):
+    """A model fit ran past its per-fit or per-request deadline"""
+
+
+class Cancelled(FitTimeout):
+    """The request was cancelled (new file loaded, spinner changed, ...)"""
+
+
+class CancelToken:
+    """
+    Shared by everything belonging to one forecast request.
+    cancel() stops the request immediately; `timeout` gives the whole
+    request a wall-clock deadline. A token with a `parent` (one stage of
+    a request, see stage_token) also stops with the parent.
+    """
+
+    def __init__(self, timeout=None, parent=None):
+        self._event = threading.Event()
+        self.parent = parent
+        self.deadline = time.time() + timeout if timeout else None
+        if parent is not None and parent.deadline is not None:
+            self.deadline = min(self.deadline or parent.deadline, parent.deadline)
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set() or (self.parent is not None
+                                         and self.parent.cancelled)
+
+    def expired(self):
+        return self.deadline is not None and time.time() > self.deadline
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled("request cancelled")
+        if self.expired():
+            raise FitTimeout("request deadline passed")
+
+
+# Fit limits for the current thread; set around every task so fit_sarimax
+# can stop the optimiser from its callback, inside workers too
+_limits = threading.local()
+
+
+def fit_deadline():
+    """Absolute time.time() by which a fit starting now must finish, or None"""
+    fit_timeout = getattr(_limits, "fit_timeout", None)
+    request_deadline = getattr(_limits, "deadline", None)
+    deadlines = [d for d in (request_deadline,
+                             time.time() + fit_timeout if fit_timeout else None)
+                 if d is not None]
+    return min(deadlines) if deadlines else None
+
+
+def check_limits():
+    """Raise when the current thread's request is cancelled or out of time"""
+    token = getattr(_limits, "token", None)
+    if token is not None:
+        token.check()
+    deadline = getattr(_limits, "deadline", None)
+    if deadline is not None and time.time() > deadline:
+        raise FitTimeout("request deadline passed")
+
+
+def stage_token(timeout):
+    """
+    CancelToken for one stage of the current request (e.g. a search with
+    its own time budget): it expires after `timeout` seconds or at the
+    request deadline, and is cancelled with the request's token
+    """
+    token = CancelToken(timeout, parent=getattr(_limits, "token", None))
+    request_deadline = getattr(_limits, "deadline", None)
+    if request_deadline is not None:
+        token.deadline = min(token.deadline or request_deadline, request_deadline)
+    return token
+
+
+def _call_with_limits(fit_timeout, deadline, fn, args, token=None):
+    # the token itself only travels to in-process calls, workers get the deadline
+    previous = (getattr(_limits, "fit_timeout", None),
+                getattr(_limits, "deadline", None),
+                getattr(_limits, "token", None))
+    _limits.fit_timeout, _limits.deadline = fit_timeout, deadline
+    _limits.token = token or previous[2]
+    try:
+        return fn(*args)
+    finally:
+        _limits.fit_timeout, _limits.deadline, _limits.token = previous
+
+
+def in_worker():
+    """True when running inside a pool worker (no nested pools there)"""
+    return multiprocessing.parent_process() is not None
+
+
+def get_executor(max_workers=None):
+    """
+    returns the shared process pool, creating it on first use
+    so statsmodels is only imported once per worker
+    """
+    global _executor
+
+    if _executor is None:
+        workers = max_workers or max(1, min(8, (os.cpu_count() or 2) - 1))
+        _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the shared pool (called on app exit)"""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def terminate_executor():
+    """Kill the shared pool's workers outright; a new pool is made on next use"""
+    global _executor
+
+    executor, _executor = _executor, None
+    if executor is None:
+        return
+    for proc in list(getattr(executor, "_processes", {}).values()):
+        try:
+            proc.terminate()
+        except Exception:
+            pass
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _reap(executor, futures, reason):
+    """
+    Kill the pool if abandoned work is still running after the grace
+    period. While other requests have work in the pool, look again after
+    another grace period instead of killing theirs too.
+    """
+    running = [f for f in futures if f.running()]
+    if executor is not _executor or not running:
+        return
+    with _inflight_lock:
+        if not any(not f.done() for f in _inflight):
+            print(f"[parallel] {len(running)} fit(s) of a {reason} request "
+                  f"still running, restarting worker pool")
+            terminate_executor()
+            return
+    _schedule_reap(executor, running, reason)
+
+
+def _schedule_reap(executor, running, reason):
+    timer = threading.Timer(KILL_GRACE, _reap, (executor, running, reason))
+    timer.daemon = True
+    timer.start()
+
+
+def _abandon(executor, futures, reason):
+    """reason ("cancelled" or "timed out") is only used for the log line"""
+    for fut in futures:
+        fut.cancel()
+    with _inflight_lock:
+        _inflight.difference_update(futures)
+    running = [f for f in futures if f.running()]
+    if running:
+        _schedule_reap(executor, running, reason)
+
+
+def _run_serial(fn, args, fit_timeout, deadline, token=None):
+    try:
+        return _call_with_limits(fit_timeout, deadline, fn, args, token)
+    except Exception:
+        return None
+
+
+def run_all(tasks, executor=None, token=None, fit_timeout=None, on_result=None):
+    """
+    runs every (fn, args) task and returns the results in submission
+    order, so callers behave exactly like a serial loop.
+    A task that raises or times out gives None in its slot.
+
+    fit_timeout bounds every single model fit; token carries the request
+    deadline and cancellation. Cancelling raises Cancelled straight away,
+    a passed request deadline leaves the unfinished slots as None.
+    on_result(index, result) is called as each task finishes.
+    """
+    if token is None:
+        # nested call inside a task: inherit the outer request's token
+        token = getattr(_limits, "token", None)
+    deadline = token.deadline if token is not None else None
+    if fit_timeout is None:
+        fit_timeout = getattr(_limits, "fit_timeout", None)
+    if deadline is None:
+        deadline = getattr(_limits, "deadline", None)
+
+    if executor is None or in_worker() or len(tasks) < 2:
+        results = []
+        for i, (fn, args) in enumerate(tasks):
+            if token is not None:
+                if token.cancelled:
+                    raise Cancelled("request cancelled")
+                if token.expired():
+                    results.append(None)
+                    continue
+            results.append(_run_serial(fn, args, fit_timeout, deadline, token))
+            if on_result is not None:
+                on_result(i, results[-1])
+        if token is not None and token.cancelled:
+            raise Cancelled("request cancelled")
+        return results
+
+    try:
+        # under the lock, so _reap cannot kill the pool in between
+        with _inflight_lock:
+            futures = [executor.submit(_call_with_limits, fit_timeout, deadline,
+                                       fn, args)
+                       for fn, args in tasks]
+            _inflight.update(futures)
+    except (BrokenProcessPool, RuntimeError):
+        # pool died or was shut down, the serial path still gives the answer
+        if executor is _executor:
+            shutdown_executor()
+        return run_all(tasks, None, token, fit_timeout, on_result)
+
+    results = [None] * len(tasks)
+    index = {fut: i for i, fut in enumerate(futures)}
+    pending = set(futures)
+    poll = 0.05 if token is not None else None
+    try:
+        while pending:
+            if token is not None and token.cancelled:
+                _abandon(executor, list(pending), "cancelled")
+                raise Cancelled("request cancelled")
+            if token is not None and token.expired():
+                _abandon(executor, list(pending), "timed out")
+                return results
+
+            done, pending = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+            for fut in sorted(done, key=index.get):
+                i = index[fut]
+                try:
+                    results[i] = fut.result()
+                except BrokenProcessPool:
+                    fn, args = tasks[i]
+                    results[i] = _run_serial(fn, args, fit_timeout, deadline)
+                except Exception:
+                    results[i] = None
+                if on_result is not None:
+                    on_result(i, results[i])
+    finally:
+        with _inflight_lock:
+            _inflight.difference_update(futures)
+    return results
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+WEEKEND = 5   # dayofweek from which days count as weekend (Sat, Sun)
+
+
+class SalesStore:
+    """
+    Column store for one uploaded sales file, built once per upload.
+
+    Every product is a contiguous float array (NaN for blanks) aligned with
+    a datetime64 index. The derived columns every page needs are computed up
+    front: `total` (products summed, blanks as 0), `dow` (0 = Monday,
+    -1 for a missing date) and `iso_year` / `iso_week` (0 for a missing
+    date). Aggregates are computed on first use and cached.
+
+    A store is never modified after it is built; append() returns a new one,
+    so a worker thread can keep reading the old store.
+    """
+
+    def __init__(self, dates, columns, derived=None):
+        self.dates    = np.asarray(dates, dtype="datetime64[ns]")
+        self.products = list(columns)
+        self._values  = {c: np.ascontiguousarray(v, dtype=float)
+                         for c, v in columns.items()}
+        self._cache   = {}
+
+        if derived is None:
+            derived = self._derive()
+        self.total, self.dow, self.iso_year, self.iso_week = derived
+
+    def _derive(self):
+        total = np.zeros(len(self.dates))
+        for values in self._values.values():
+            total += np.nan_to_num(values)
+
+        valid = ~np.isnat(self.dates)
+        days  = self.dates.astype("datetime64[D]").astype(np.int64)
+        # 1970-01-01 was a Thursday
+        dow = np.where(valid, (days + 3) % 7, -1)
+
+        iso = pd.DatetimeIndex(self.dates).isocalendar()
+        iso_year = iso["year"].astype("Int64").fillna(0).to_numpy(np.int64)
+        iso_week = iso["week"].astype("Int64").fillna(0).to_numpy(np.int64)
+        return total, dow, iso_year, iso_week
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a frame with a Date column and one column per product"""
+        dates = pd.to_datetime(df["Date"], errors="coerce").to_numpy()
+        columns = {c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)
+                   for c in df.columns if c != "Date"}
+        return cls(dates, columns)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def last_date(self):
+        """Latest date in the store, None if there is none"""
+        valid = self.dates[~np.isnat(self.dates)]
+        return valid.max() if len(valid) else None
+
+    def append(self, tail):
+        """
+        New store with the rows of `tail` (another SalesStore) after these.
+        The new rows must be dated after last_date(), except rows that only
+        fill products blank on a day already loaded (e.g. the Croissant
+        file's new day after the Coffee file's, in a store merged by
+        read_many); those fill that day in place. A product missing on
+        either side is blank there. Only the new rows' derived columns are
+        computed. Raises ValueError if the tail has a value where this store
+        already has one, or a date that is neither new nor loaded once.
+        """
+        if len(tail) == 0:
+            return self
+        last = self.last_date()
+        old_rows = (~np.isnat(tail.dates) & (tail.dates <= last)
+                    if last is not None else np.zeros(len(tail), dtype=bool))
+        base = self._filled(tail, np.flatnonzero(old_rows)) if old_rows.any() else self
+        tail = tail._rows(~old_rows) if old_rows.any() else tail
+        if len(tail) == 0:
+            return base
+
+        def column(store, product):
+            if product in store._values:
+                return store._values[product]
+            return np.full(len(store), np.nan)
+
+        products = base.products + [p for p in tail.products if p not in base._values]
+        columns  = {p: np.concatenate([column(base, p), column(tail, p)])
+                    for p in products}
+        derived  = tuple(np.concatenate([a, b]) for a, b in
+                         zip((base.total, base.dow, base.iso_year, base.iso_week),
+                             (tail.total, tail.dow, tail.iso_year, tail.iso_week)))
+        return SalesStore(np.concatenate([base.dates, tail.dates]), columns, derived)
+
+    def _rows(self, keep):
+        """Store of the rows selected by the boolean mask `keep`"""
+        return SalesStore(self.dates[keep], {p: v[keep] for p, v in self._values.items()},
+                          (self.total[keep], self.dow[keep],
+                           self.iso_year[keep], self.iso_week[keep]))
+
+    def _filled(self, tail, rows):
+        """Copy with the tail's `rows` (dated on loaded days) written into
+        products that are blank on those days"""
+        order = np.argsort(self.dates, kind="stable")
+        dates = self.dates[order]
+        columns = dict(self._values)
+        total = self.total.copy()
+        for i in rows:
+            day = tail.dates[i]
+            lo, hi = np.searchsorted(dates, day, "left"), np.searchsorted(dates, day, "right")
+            if hi - lo != 1:
+                raise ValueError(
+                    f"New rows start at {pd.Timestamp(day):%d %b %Y}, "
+                    f"which is not after the last loaded day "
+                    f"{pd.Timestamp(self.last_date()):%d %b %Y}")
+            at = order[lo]
+            for p in tail.products:
+                value = tail._values[p][i]
+                if np.isnan(value):
+                    continue
+                if p not in columns:
+                    columns[p] = np.full(len(self), np.nan)
+                elif not np.isnan(columns[p][at]):
+                    raise ValueError(f"{p} already has sales on "
+                                     f"{pd.Timestamp(day):%d %b %Y}")
+                if columns[p] is self._values.get(p):
+                    columns[p] = columns[p].copy()  # this store stays as it is
+                columns[p][at] = value
+                total[at] += value
+        return SalesStore(self.dates, columns,
+                          (total, self.dow, self.iso_year, self.iso_week))
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    # Columns
+    def values(self, product):
+        """All rows of one product, NaN where blank"""
+        return self._values[product]
+
+    def observed(self, product):
+        """One product with the blanks dropped"""
+        return self._cached(("observed", product),
+                            lambda: self._values[product][~np.isnan(self._values[product])])
+
+    def series(self, product):
+        """Date-indexed series with blanks dropped, like ml.product_series"""
+        def build():
+            values = self._values[product]
+            keep = ~np.isnan(values) & ~np.isnat(self.dates)
+            return pd.Series(values[keep], index=pd.DatetimeIndex(self.dates[keep]),
+                             name=product)
+        return self._cached(("series", product), build)
+
+    def frame(self):
+        """The cleaned data as a DataFrame (Date + product columns)"""
+        def build():
+            df = pd.DataFrame(self._values)
+            df.insert(0, "Date", self.dates)
+            return df
+        return self._cached("frame", build)
+
+    # Aggregates
+    def stats(self, product):
+        """count / sum / mean / std (sample) of a product's observed values"""
+        def build():
+            x = self.observed(product)
+            n = len(x)
+            return {"count": n,
+                    "sum":   float(x.sum()),
+                    "mean":  float(x.mean()) if n else np.nan,
+                    "std":   float(x.std(ddof=1)) if n > 1 else np.nan}
+        return self._cached(("stats", product), build)
+
+    def total_stats(self):
+        """sum / mean / std (sample) / max of the daily total"""
+        def build():
+            t = self.total
+            n = len(t)
+            return {"sum":  float(t.sum()),
+                    "mean": float(t.mean()) if n else np.nan,
+                    "std":  float(t.std(ddof=1)) if n > 1 else np.nan,
+                    "max":  float(t.max()) if n else np.nan}
+        return self._cached("total_stats", build)
+
+    def dow_means(self):
+        """{dayofweek: mean daily total} for the weekdays present"""
+        def build():
+            return {int(d): float(self.total[self.dow == d].mean())
+                    for d in np.unique(self.dow[self.dow >= 0])}
+        return self._cached("dow_means", build)
+
+    def weekday_weekend_means(self):
+        """(mean weekday total, mean weekend total), NaN when there are none"""
+        def build():
+            weekday = self.total[(self.dow >= 0) & (self.dow < WEEKEND)]
+            weekend = self.total[self.dow >= WEEKEND]
+            return (float(weekday.mean()) if len(weekday) else np.nan,
+                    float(weekend.mean()) if len(weekend) else np.nan)
+        return self._cached("weekday_weekend", build)
+
+    def weekly_totals(self):
+        """Units sold per ISO week as a Series indexed by (iso_year, iso_week)"""
+        def build():
+            valid = self.iso_week > 0
+            return (pd.Series(self.total[valid])
+                    .groupby([self.iso_year[valid], self.iso_week[valid]]).sum())
+        return self._cached("weekly_totals", build)